@@ -7,28 +7,48 @@
 
 # TODO: Save your python object in a new JSON file located in the `output`folder. 
 
-import json
+import argparse
+import os
+import sys
 
+# Streaming reader of the JSON array, shared by the three movie_wiki.py (repository root)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json_stream  # noqa: E402
 
-def load_movie_list():
-    with open("../input/wiki_movie_plots.json", "r", encoding="utf-8") as file:
-        return json.load(file)
+INPUT_PATH = "../input/wiki_movie_plots.json"
+OUTPUT_BASE = "../output/british_movies"
+OUTPUT_PATH = OUTPUT_BASE + ".json"
+CHUNK_SIZE = json_stream.CHUNK_SIZE
+
+
+def load_movie_list(path=INPUT_PATH, chunk_size=CHUNK_SIZE):
+    """Yield the movies one by one instead of loading the whole array in memory."""
+    return (movie for _, _, movie in json_stream.scan(path, chunk_size))
 
-       
 
 def classify(movies, origin="British"):
-    return [movie for movie in movies if movie.get("Origin").get("Ethnicity") == origin]
+    return (movie for movie in movies if movie.get("Origin").get("Ethnicity") == origin)
 
 
-def save_movie_list(movies):
-    with open("../output/british_movies.json", "w", encoding="utf-8") as f:
-        json.dump(movies, f)
+def save_movie_list(movies, path=OUTPUT_PATH, fmt="json", compression=None):
+    """Write the movies as they come and return how many.
+
+    fmt="json" gives the same output as json.dump of a list, fmt="jsonl" one movie per line;
+    compression is None, "gzip", "bz2" or "xz". The file only appears once it is complete.
+    """
+    return json_stream.write(movies, path, fmt, compression)
 
 def main():
+    parser = argparse.ArgumentParser(description="Select the British movies of wiki_movie_plots.json.")
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json")
+    parser.add_argument("--compress", choices=[c for c in json_stream.OPENERS if c])
+    args = parser.parse_args()
+    path = f"{OUTPUT_BASE}.{args.format}{json_stream.EXTENSIONS[args.compress]}"
+
     movies = load_movie_list()
     british_movies = classify(movies, "British")
-    save_movie_list(british_movies)
-    print(f"{len(british_movies)} films britanniques sauvegardés dans '../output/british_movies.json'")
+    count = save_movie_list(british_movies, path, args.format, args.compress)
+    print(f"{count} films britanniques sauvegardés dans '{path}'")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
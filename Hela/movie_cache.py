@@ -0,0 +1,279 @@
+"""Cache colonnaire de wiki_movie_plots.json, relu par mmap.
+
+Le JSON n'est analysé qu'une fois : les colonnes de taille fixe (année, code d'origine,
+position du film dans la source) sont stockées en tableaux, et les textes (titre, réalisateur,
+distribution, genre, résumé) dans un tas d'octets avec un tableau d'offsets par champ.
+Filtrer par origine revient alors à parcourir une petite colonne d'entiers, et seuls les films
+retenus sont décodés. Si la source a seulement reçu de nouveaux films en fin de tableau (octets
+des films déjà en cache inchangés), seuls ceux-ci sont analysés et ajoutés aux colonnes ; sinon
+le cache est reconstruit.
+"""
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from contextlib import nullcontext
+from itertools import compress
+
+import movie_wiki
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+NO_YEAR = -1
+YEAR_MAX = (1 << (8 * array("i").itemsize - 1)) - 1
+YEAR_MIN = -YEAR_MAX - 1
+TEXT_FIELDS = ("Title", "Director", "Cast", "Genre", "Plot")
+FLUSH_EVERY = 1 << 16
+ALIGN = 8
+
+
+class ColumnWriter:
+    """Colonne d'entiers écrite dans un fichier temporaire par paquets de FLUSH_EVERY valeurs."""
+
+    def __init__(self, directory, typecode, base=None):
+        self.typecode = typecode
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.buffer = array(typecode)
+        if base is not None:
+            base(self.file)          # valeurs déjà en cache, recopiées telles quelles
+
+    def append(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        del self.buffer[:]
+
+
+class TextWriter:
+    """Tas d'octets UTF-8 + colonne d'offsets (n + 1 valeurs) pour un champ texte."""
+
+    def __init__(self, directory, base=None):
+        self.heap = tempfile.TemporaryFile(dir=directory)
+        if base is None:
+            self.offsets = ColumnWriter(directory, "q")
+            self.offsets.append(0)
+            self.size = 0
+        else:
+            copy_heap, copy_offsets, self.size = base
+            copy_heap(self.heap)
+            self.offsets = ColumnWriter(directory, "q", copy_offsets)
+
+    def append(self, text):
+        data = ("" if text is None else str(text)).encode("utf-8")
+        self.heap.write(data)
+        self.size += len(data)
+        self.offsets.append(self.size)
+
+
+def parse_year(value):
+    """Année entière, NO_YEAR si elle est absente, illisible ou trop grande pour la colonne "i"."""
+    try:
+        year = int(value)
+    except (TypeError, ValueError, OverflowError):       # OverflowError : int(float("inf"))
+        return NO_YEAR
+    return year if YEAR_MIN <= year <= YEAR_MAX else NO_YEAR
+
+
+def cache_path(path):
+    return path + CACHE_SUFFIX
+
+
+def _section_copier(cache_file, section):
+    """Fonction qui recopie une section du cache existant dans un fichier temporaire."""
+    start, size, _ = section
+
+    def copy(out):
+        cache_file.seek(start)
+        remaining = size
+        while remaining:
+            block = cache_file.read(min(remaining, 1 << 20))
+            if not block:
+                raise ValueError("cache tronqué")
+            out.write(block)
+            remaining -= len(block)
+    return copy
+
+
+def build_cache(path=movie_wiki.INPUT_PATH, base=None):
+    """Convertit la source en cache colonnaire en une seule lecture ; renvoie l'en-tête.
+
+    base : en-tête d'un cache existant dont les films sont un préfixe inchangé de la source ;
+    ses colonnes sont recopiées et seuls les films suivants sont analysés.
+    """
+    fingerprint = movie_wiki.source_fingerprint(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    with open(cache_path(path), "rb") if base is not None else nullcontext() as old:
+        def copier(name):
+            return None if base is None else _section_copier(old, base["sections"][name])
+
+        columns = {name: ColumnWriter(directory, typecode, copier(name))
+                   for name, typecode in (("year", "i"), ("origin", "i"), ("offset", "q"), ("length", "q"))}
+        texts = {
+            field: TextWriter(directory, None if base is None else (
+                copier(f"{field}.heap"), copier(f"{field}.offsets"), base["sections"][f"{field}.heap"][1]))
+            for field in TEXT_FIELDS
+        }
+    codes = {} if base is None else {origin: code for code, origin in enumerate(base["origins"])}
+    count = 0 if base is None else base["count"]
+    end = 0 if base is None else base["prefix"][0]
+    # Source vide (0 octet) : cache vide, comme pour "[]"
+    movies = movie_wiki.scan(path, with_offsets=True, start=end) if os.path.getsize(path) else ()
+    for offset, size, movie in movies:
+        origin = movie_wiki.origin_of(movie)
+        columns["year"].append(parse_year(movie.get("Release Year")))
+        columns["origin"].append(codes.setdefault(origin, len(codes)))
+        columns["offset"].append(offset)
+        columns["length"].append(size)
+        for field, writer in texts.items():
+            writer.append(movie.get(field))
+        count += 1
+        end = offset + size
+
+    sections = dict(columns)
+    for field, writer in texts.items():
+        sections[f"{field}.offsets"] = writer.offsets
+        sections[f"{field}.heap"] = writer
+    layout = {}
+    tmp_path = cache_path(path) + ".tmp"
+    with open(tmp_path, "wb") as out:
+        for name, section in sections.items():
+            if isinstance(section, ColumnWriter):
+                section.flush()
+                f, typecode = section.file, section.typecode
+            else:
+                f, typecode = section.heap, "B"
+            out.write(b"\0" * (-out.tell() % ALIGN))
+            start = out.tell()
+            f.seek(0)
+            shutil.copyfileobj(f, out)
+            f.close()
+            layout[name] = [start, out.tell() - start, typecode]
+        # Fin du dernier film et empreinte des octets jusque-là : de quoi reconnaître un simple ajout
+        prefix = [end, movie_wiki.prefix_digest(path, end)] if count else None
+        header = dict(fingerprint, version=CACHE_VERSION, byteorder=sys.byteorder, count=count,
+                      origins=list(codes), sections=layout, prefix=prefix)
+        header_start = out.tell()
+        out.write(json.dumps(header, ensure_ascii=False).encode("utf-8"))
+        out.write(header_start.to_bytes(8, "little"))
+    os.replace(tmp_path, cache_path(path))
+    return header
+
+
+def _read_header(path):
+    """En-tête du cache tel qu'il est sur disque (None s'il est absent ou d'une autre version)."""
+    try:
+        with open(cache_path(path), "rb") as f:
+            f.seek(-8, os.SEEK_END)
+            end = f.tell()
+            header_start = int.from_bytes(f.read(8), "little")
+            f.seek(header_start)
+            header = json.loads(f.read(end - header_start))
+    except (OSError, ValueError):
+        return None
+    if header.get("version") != CACHE_VERSION or header.get("byteorder") != sys.byteorder:
+        return None
+    return header
+
+
+def read_header(path):
+    """En-tête du cache, ou None s'il est absent, d'une autre version ou périmé."""
+    header = _read_header(path)
+    if header is None or any(header.get(k) != v for k, v in movie_wiki.source_fingerprint(path).items()):
+        return None
+    return header
+
+
+def update_cache(path=movie_wiki.INPUT_PATH):
+    """Met le cache à jour : rien s'il est à jour, ajout des nouveaux films si la source n'a fait
+    que grandir en fin de tableau, reconstruction sinon. Renvoie l'en-tête."""
+    header = _read_header(path)
+    if header is not None and all(header.get(k) == v for k, v in movie_wiki.source_fingerprint(path).items()):
+        return header
+    prefix = header and header.get("prefix")
+    if prefix and os.path.getsize(path) >= prefix[0] and movie_wiki.prefix_digest(path, prefix[0]) == prefix[1]:
+        try:
+            return build_cache(path, base=header)
+        except ValueError:
+            pass                     # cache abîmé ou fin de la source illisible : reconstruction complète
+    return build_cache(path)
+
+
+class MovieCache:
+    """Lecture du cache par mmap : les colonnes sont des memoryview, sans copie."""
+
+    def __init__(self, path=movie_wiki.INPUT_PATH):
+        header = read_header(path)
+        if header is None:
+            update_cache(path)
+            header = read_header(path)
+        self.path = path
+        self.count = header["count"]
+        self.origins = header["origins"]
+        self._codes = {origin: code for code, origin in enumerate(self.origins)}
+        with open(cache_path(path), "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path, "rb") as f:
+            # mmap refuse un fichier vide : aucun film à relire, des octets vides suffisent
+            self._source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._views = {}
+        for name, (start, size, typecode) in header["sections"].items():
+            self._views[name] = memoryview(self._map)[start:start + size].cast(typecode)
+        self.year = self._views["year"]
+        self.origin = self._views["origin"]
+
+    def close(self):
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._map.close()
+        if isinstance(self._source, mmap.mmap):
+            self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def origin_code(self, origin):
+        """Code entier d'une origine, None si elle n'apparaît pas dans la source."""
+        return self._codes.get(origin)
+
+    def rows_for_origin(self, origin):
+        code = self.origin_code(origin)
+        if code is None:
+            return []
+        return list(compress(range(self.count), map(code.__eq__, self.origin)))
+
+    def text(self, field, row):
+        """Valeur d'un champ texte décodée depuis le tas, sans toucher au JSON source."""
+        offsets = self._views[f"{field}.offsets"]
+        heap = self._views[f"{field}.heap"]
+        return bytes(heap[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def span(self, row):
+        """(offset, taille) en octets du film dans la source."""
+        return self._views["offset"][row], self._views["length"][row]
+
+    def raw(self, row):
+        """Octets JSON du film tels qu'ils figurent dans la source."""
+        offset, length = self.span(row)
+        return self._source[offset:offset + length]
+
+    def movie(self, row):
+        """Film complet, relu dans la source à partir de sa position."""
+        return json.loads(self.raw(row))
+
+    def classify(self, origin):
+        """Comme movie_wiki.classify(load(), origin), en ne décodant que les films retenus."""
+        for row in self.rows_for_origin(origin):
+            yield self.movie(row)
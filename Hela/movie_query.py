@@ -0,0 +1,173 @@
+"""Requêtes multi-champs sur les films de wiki_movie_plots.json.
+
+Une requête est une simple structure JSON :
+- une clause [champ, opérateur, valeur], par ex. ["origin", "eq", "British"] ou
+  ["year", "between", [1990, 1999]] (bornes incluses, null = pas de borne) ;
+- une combinaison {"and": [...]} ou {"or": [...]}.
+
+Champs : year, origin, title, director, cast, genre, plot.
+Opérateurs : eq, in (liste de valeurs), between, contains (sous-chaîne, casse ignorée).
+
+compile_query() transforme la requête en une seule fonction Python générée (chaque champ
+n'est lu qu'une fois par film) ; select() l'évalue en masse sur un movie_cache.MovieCache :
+les clauses sur l'année et l'origine parcourent les colonnes d'entiers, les clauses texte
+ne lisent que les tas de texte des lignes encore candidates.
+"""
+from itertools import compress
+
+FIELDS = {
+    "year": "to_year(m.get('Release Year'))",
+    "origin": "(m.get('Origin') or {}).get('Ethnicity')",
+    "title": "(m.get('Title') or '')",
+    "director": "(m.get('Director') or '')",
+    "cast": "(m.get('Cast') or '')",
+    "genre": "(m.get('Genre') or '')",
+    "plot": "(m.get('Plot') or '')",
+}
+CACHE_TEXT_FIELDS = {"title": "Title", "director": "Director", "cast": "Cast", "genre": "Genre", "plot": "Plot"}
+OPERATORS = ("eq", "in", "between", "contains")
+CACHE_NO_YEAR = -1
+
+
+def to_year(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def check_clause(clause):
+    if not isinstance(clause, (list, tuple)) or len(clause) != 3:
+        raise ValueError(f"clause invalide : {clause!r} (attendu [champ, opérateur, valeur])")
+    field, op, value = clause
+    if field not in FIELDS:
+        raise ValueError(f"champ inconnu : {field!r} (choix : {', '.join(FIELDS)})")
+    if op not in OPERATORS:
+        raise ValueError(f"opérateur inconnu : {op!r} (choix : {', '.join(OPERATORS)})")
+    if op == "between" and (not isinstance(value, (list, tuple)) or len(value) != 2):
+        raise ValueError(f"between attend [min, max] : {clause!r}")
+    return field, op, value
+
+
+def combination(query):
+    """('and' | 'or', sous-requêtes) si query est une combinaison, sinon None."""
+    if isinstance(query, dict):
+        if len(query) != 1 or next(iter(query)) not in ("and", "or"):
+            raise ValueError(f"combinaison invalide : {query!r} (attendu {{'and': [...]}} ou {{'or': [...]}})")
+        (kind, parts), = query.items()
+        return kind, list(parts)
+    return None
+
+
+def clause_source(clause, consts):
+    """Expression Python d'une clause, les valeurs passant par des constantes c0, c1..."""
+    field, op, value = check_clause(clause)
+    var = f"f_{field}"
+
+    def const(v):
+        consts.append(v)
+        return f"c{len(consts) - 1}"
+
+    if op == "eq":
+        return f"{var} == {const(value)}"
+    if op == "in":
+        return f"{var} in {const(frozenset(value))}"
+    if op == "contains":
+        return f"{const(str(value).lower())} in ({var} or '').lower()"
+    lo, hi = value
+    tests = [f"{var} is not None"]
+    if lo is not None:
+        tests.append(f"{const(lo)} <= {var}")
+    if hi is not None:
+        tests.append(f"{var} <= {const(hi)}")
+    return "(" + " and ".join(tests) + ")"
+
+
+def query_source(query, consts, fields):
+    parts = combination(query)
+    if parts is None:
+        source = clause_source(query, consts)
+        fields.add(query[0])
+        return source
+    kind, children = parts
+    if not children:
+        return "True" if kind == "and" else "False"
+    return "(" + f" {kind} ".join(query_source(c, consts, fields) for c in children) + ")"
+
+
+def compile_query(query):
+    """Compile la requête en un prédicat predicate(movie) -> bool."""
+    consts, fields = [], set()
+    expr = query_source(query, consts, fields)
+    lines = ["def predicate(m):"]
+    lines += [f"    f_{field} = {FIELDS[field]}" for field in sorted(fields)]
+    lines.append(f"    return {expr}")
+    namespace = {"to_year": to_year}
+    namespace.update((f"c{i}", c) for i, c in enumerate(consts))
+    exec("\n".join(lines), namespace)
+    return namespace["predicate"]
+
+
+def filter_movies(movies, query):
+    predicate = compile_query(query)
+    return (m for m in movies if predicate(m))
+
+
+def value_test(clause):
+    """Prédicat sur la seule valeur du champ de la clause, pour l'évaluation en masse."""
+    consts = []
+    expr = clause_source(clause, consts)
+    namespace = {f"c{i}": c for i, c in enumerate(consts)}
+    exec(f"def test(f_{clause[0]}):\n    return {expr}", namespace)
+    return namespace["test"]
+
+
+def clause_cost(clause):
+    """Les clauses sur colonnes d'entiers passent avant les clauses texte dans un 'and'."""
+    parts = combination(clause)
+    if parts is not None:
+        return max((clause_cost(c) for c in parts[1]), default=0)
+    return 0 if clause[0] in ("year", "origin") else 1
+
+
+def clause_rows(clause, cache, candidates):
+    field, _, _ = check_clause(clause)
+    test = value_test(clause)
+    if field == "origin":
+        codes = {code for code, origin in enumerate(cache.origins) if test(origin)}
+        column, keep = cache.origin, codes.__contains__
+    elif field == "year":
+        column = cache.year
+        keep = lambda year: test(None if year == CACHE_NO_YEAR else year)
+    else:
+        name = CACHE_TEXT_FIELDS[field]
+        rows = range(cache.count) if candidates is None else candidates
+        return {row for row in rows if test(cache.text(name, row))}
+    if candidates is None:
+        return set(compress(range(cache.count), map(keep, column)))
+    return {row for row in candidates if keep(column[row])}
+
+
+def query_rows(query, cache, candidates=None):
+    """Ensemble des lignes du cache (parmi candidates si donné) qui satisfont la requête."""
+    parts = combination(query)
+    if parts is None:
+        return clause_rows(query, cache, candidates)
+    kind, children = parts
+    if kind == "and":
+        rows = candidates
+        for child in sorted(children, key=clause_cost):
+            rows = query_rows(child, cache, rows)
+            if not rows:
+                return set()
+        return set(range(cache.count)) if rows is None else rows
+    rows = set()
+    for child in children:
+        rows |= query_rows(child, cache, candidates)
+    return rows
+
+
+def select(query, cache):
+    """Films du cache qui satisfont la requête, dans l'ordre du fichier source."""
+    for row in sorted(query_rows(query, cache)):
+        yield cache.movie(row)
@@ -0,0 +1,304 @@
+"""Recherche plein texte (BM25) dans les titres et résumés de wiki_movie_plots.json.
+
+L'index inversé est stocké à côté de la source, dans <source>.search/ :
+- des segments, chacun couvrant une plage de lignes du cache colonnaire (movie_cache) ;
+  un segment contient le lexique trié (recherche par dichotomie, sans tout charger),
+  les listes de postings compressées (écarts de numéros de ligne + fréquences en varint)
+  et la longueur de chaque document ;
+- manifest.json, qui liste les segments et les statistiques globales.
+
+Si la source a seulement reçu de nouveaux films en fin de tableau, seuls ceux-ci sont
+indexés dans un nouveau segment ; sinon l'index est reconstruit. La recherche peut être
+restreinte par une requête movie_query (par ex. ["origin", "eq", "British"]).
+"""
+import argparse
+import bisect
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+from array import array
+
+import movie_cache
+import movie_query
+import movie_wiki
+
+SEARCH_SUFFIX = ".search"
+SEARCH_VERSION = 1
+SEGMENT_DOCS = 100_000
+TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has he her his in is it its of on or she that the "
+    "their them they this to was were which while who with".split()
+)
+K1 = 1.2
+B = 0.75
+ALIGN = 8
+
+
+def tokenize(text):
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_postings(data):
+    """Décode une liste de postings : [(document local au segment, fréquence), ...]."""
+    postings = []
+    doc = n = shift = 0
+    pending = None
+    for byte in data:
+        n |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if pending is None:
+            doc += n
+            pending = doc
+        else:
+            postings.append((pending, n))
+            pending = None
+        n = shift = 0
+    return postings
+
+
+def document_text(cache, row):
+    return cache.text("Title", row) + "\n" + cache.text("Plot", row)
+
+
+def write_segment(path, start, end, cache):
+    """Indexe les lignes [start, end) du cache dans le fichier de segment path."""
+    postings = {}
+    doclen = array("I")
+    for row in range(start, end):
+        doc = row - start
+        counts = {}
+        tokens = tokenize(document_text(cache, row))
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        doclen.append(len(tokens))
+        for token, tf in counts.items():
+            entry = postings.get(token)
+            if entry is None:
+                entry = postings[token] = [bytearray(), 0, 0]
+            put_varint(entry[0], doc - entry[1])
+            put_varint(entry[0], tf)
+            entry[1] = doc
+            entry[2] += 1
+
+    terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    term_heap = bytearray()
+    term_offsets = array("q", [0])
+    df = array("I")
+    posting_heap = bytearray()
+    posting_offsets = array("q", [0])
+    for term in terms:
+        data, _, count = postings.pop(term)
+        term_heap += term.encode("utf-8")
+        term_offsets.append(len(term_heap))
+        df.append(count)
+        posting_heap += data
+        posting_offsets.append(len(posting_heap))
+    sections = {
+        "terms.heap": (term_heap, "B"),
+        "terms.offsets": (term_offsets, "q"),
+        "df": (df, "I"),
+        "postings.offsets": (posting_offsets, "q"),
+        "postings": (posting_heap, "B"),
+        "doclen": (doclen, "I"),
+    }
+    layout = {}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        for name, (data, typecode) in sections.items():
+            out.write(b"\0" * (-out.tell() % ALIGN))
+            layout[name] = [out.tell(), len(data) * (data.itemsize if isinstance(data, array) else 1), typecode]
+            out.write(data)
+        header = {"start": start, "end": end, "length": sum(doclen), "byteorder": sys.byteorder,
+                  "sections": layout}
+        header_start = out.tell()
+        out.write(json.dumps(header).encode("utf-8"))
+        out.write(header_start.to_bytes(8, "little"))
+    os.replace(tmp_path, path)
+    return {"file": os.path.basename(path), "start": start, "end": end, "length": header["length"]}
+
+
+class TermList:
+    """Séquence des termes d'un segment, lue dans le mmap à la demande (pour bisect)."""
+
+    def __init__(self, heap, offsets):
+        self.heap = heap
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.heap[self.offsets[i]:self.offsets[i + 1]])
+
+
+class Segment:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            f.seek(-8, os.SEEK_END)
+            end = f.tell()
+            header_start = int.from_bytes(f.read(8), "little")
+            f.seek(header_start)
+            header = json.loads(f.read(end - header_start))
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.start = header["start"]
+        self._views = {}
+        for name, (offset, size, typecode) in header["sections"].items():
+            self._views[name] = memoryview(self._map)[offset:offset + size].cast(typecode)
+        self.terms = TermList(self._views["terms.heap"], self._views["terms.offsets"])
+        self.df = self._views["df"]
+        self.doclen = self._views["doclen"]
+
+    def lookup(self, term):
+        """Indice du terme dans le lexique, ou None."""
+        key = term.encode("utf-8")
+        i = bisect.bisect_left(self.terms, key)
+        if i < len(self.terms) and self.terms[i] == key:
+            return i
+        return None
+
+    def postings(self, i):
+        offsets = self._views["postings.offsets"]
+        return read_postings(self._views["postings"][offsets[i]:offsets[i + 1]])
+
+    def close(self):
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._map.close()
+
+
+class SearchIndex:
+    """Index plein texte de la source, mis à jour (ajout ou reconstruction) à l'ouverture."""
+
+    def __init__(self, path=movie_wiki.INPUT_PATH):
+        self.path = path
+        self.cache = movie_cache.MovieCache(path)
+        self.directory = path + SEARCH_SUFFIX
+        self.manifest = self._update()
+        self.segments = [Segment(os.path.join(self.directory, s["file"])) for s in self.manifest["segments"]]
+        self.docs = self.manifest["docs"]
+        self.avgdl = self.manifest["length"] / self.docs if self.docs else 0.0
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != SEARCH_VERSION or manifest.get("byteorder") != sys.byteorder:
+            return None
+        if all(manifest.get(k) == v for k, v in movie_wiki.source_fingerprint(self.path).items()):
+            return manifest
+        # la source a changé : l'index reste valable si elle n'a fait que grandir en fin de tableau,
+        # c'est-à-dire si les octets des films déjà indexés sont identiques
+        docs = manifest["docs"]
+        if docs > len(self.cache):
+            return None
+        if docs:
+            offset, length = self.cache.span(docs - 1)
+            if manifest["prefix"] != [offset + length, movie_wiki.prefix_digest(self.path, offset + length)]:
+                return None
+        return manifest
+
+    def _update(self):
+        manifest = self._read_manifest()
+        if manifest is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.makedirs(self.directory)
+            manifest = {"version": SEARCH_VERSION, "byteorder": sys.byteorder, "docs": 0, "length": 0,
+                        "segments": []}
+        count = len(self.cache)
+        fingerprint = movie_wiki.source_fingerprint(self.path)
+        if manifest["docs"] == count and all(manifest.get(k) == v for k, v in fingerprint.items()):
+            return manifest
+        for start in range(manifest["docs"], count, SEGMENT_DOCS):
+            end = min(start + SEGMENT_DOCS, count)
+            name = f"seg-{len(manifest['segments']):05d}.idx"
+            segment = write_segment(os.path.join(self.directory, name), start, end, self.cache)
+            manifest["segments"].append(segment)
+            manifest["length"] += segment["length"]
+        manifest["docs"] = count
+        manifest.update(fingerprint)
+        if count:
+            offset, length = self.cache.span(count - 1)
+            manifest["prefix"] = [offset + length, movie_wiki.prefix_digest(self.path, offset + length)]
+        tmp_path = os.path.join(self.directory, "manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.directory, "manifest.json"))
+        return manifest
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search(self, text, k=10, where=None):
+        """Les k meilleurs films pour le texte, [(score BM25, ligne du cache), ...].
+
+        where est une requête movie_query qui restreint les films candidats.
+        """
+        allowed = movie_query.query_rows(where, self.cache) if where is not None else None
+        if allowed is not None and not allowed:
+            return []
+        scores = {}
+        for term in set(tokenize(text)):
+            found = [(segment, segment.lookup(term)) for segment in self.segments]
+            found = [(segment, i) for segment, i in found if i is not None]
+            df = sum(segment.df[i] for segment, i in found)
+            if not df:
+                continue
+            idf = math.log(1 + (self.docs - df + 0.5) / (df + 0.5))
+            for segment, i in found:
+                doclen, start = segment.doclen, segment.start
+                for doc, tf in segment.postings(i):
+                    row = start + doc
+                    if allowed is not None and row not in allowed:
+                        continue
+                    norm = K1 * (1 - B + B * doclen[doc] / self.avgdl)
+                    scores[row] = scores.get(row, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        return heapq.nlargest(k, ((score, row) for row, score in scores.items()), key=lambda x: (x[0], -x[1]))
+
+    def search_movies(self, text, k=10, where=None):
+        return [(score, self.cache.movie(row)) for score, row in self.search(text, k, where)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche plein texte dans wiki_movie_plots.json.")
+    parser.add_argument("text", help="mots recherchés dans le titre et le résumé")
+    parser.add_argument("-k", type=int, default=10, help="nombre de résultats (défaut : 10)")
+    parser.add_argument("--origin", help="restreint la recherche à une origine, par ex. British")
+    parser.add_argument("--where", type=json.loads, metavar="QUERY", help="requête movie_query en JSON")
+    args = parser.parse_args()
+    where = args.where
+    if args.origin:
+        clause = ["origin", "eq", args.origin]
+        where = clause if where is None else {"and": [clause, where]}
+    with SearchIndex() as index:
+        for score, movie in index.search_movies(args.text, args.k, where):
+            print(f"{score:6.2f}  {movie.get('Title')} ({movie.get('Release Year')}, {movie_wiki.origin_of(movie)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Statistiques sur wiki_movie_plots.json en une seule lecture en flux.
+
+Une statistique est décrite par une chaîne :
+- "count:<groupe>"                 nombre de films par groupe ;
+- "summary:<valeur>"               nombre, somme, min, max et moyenne d'une valeur ;
+- "summary:<valeur>:<groupe>"      le même résumé pour chaque groupe.
+
+Groupes : origin, year, decade, genre (un film compte pour chacun de ses genres), director.
+Valeurs : plot_length, title_length, cast_size, year.
+
+La mémoire reste bornée : au-delà de MAX_GROUPS groupes distincts, les nouveaux groupes
+sont cumulés dans OTHER. Les résultats sont mis en cache dans <source>.stats.json avec
+l'empreinte de la source : une source inchangée répond immédiatement, et si des films ont
+seulement été ajoutés en fin de tableau, seuls ceux-ci sont lus.
+"""
+import argparse
+import json
+import os
+import re
+
+import movie_query
+import movie_wiki
+
+STATS_SUFFIX = ".stats.json"
+STATS_VERSION = 1
+MAX_GROUPS = 10_000
+OTHER = "(autres)"
+DEFAULT_SPECS = ("count:origin", "count:decade", "count:genre", "summary:plot_length")
+GENRE_SEPARATOR = re.compile(r"\s*[,/;]\s*")
+
+
+def decade(movie):
+    year = movie_query.to_year(movie.get("Release Year"))
+    return [] if year is None else [f"{year // 10 * 10}s"]
+
+
+def genres(movie):
+    text = (movie.get("Genre") or "").strip().lower()
+    return [g for g in GENRE_SEPARATOR.split(text) if g and g != "unknown"]
+
+
+GROUPS = {
+    "origin": lambda m: [movie_wiki.origin_of(m)] if movie_wiki.origin_of(m) is not None else [],
+    "year": lambda m: [y] if (y := movie_query.to_year(m.get("Release Year"))) is not None else [],
+    "decade": decade,
+    "genre": genres,
+    "director": lambda m: [d] if (d := (m.get("Director") or "").strip()) else [],
+}
+VALUES = {
+    "plot_length": lambda m: len(m.get("Plot") or ""),
+    "title_length": lambda m: len(m.get("Title") or ""),
+    "cast_size": lambda m: len([c for c in (m.get("Cast") or "").split(",") if c.strip()]),
+    "year": lambda m: movie_query.to_year(m.get("Release Year")),
+}
+
+
+def parse_spec(spec):
+    parts = spec.split(":")
+    if parts[0] == "count" and len(parts) == 2 and parts[1] in GROUPS:
+        return "count", None, parts[1]
+    if parts[0] == "summary" and len(parts) in (2, 3) and parts[1] in VALUES:
+        if len(parts) == 2 or parts[2] in GROUPS:
+            return "summary", parts[1], parts[2] if len(parts) == 3 else None
+    raise ValueError(f"statistique invalide : {spec!r} (ex. count:origin, summary:plot_length:decade ; "
+                     f"groupes : {', '.join(GROUPS)} ; valeurs : {', '.join(VALUES)})")
+
+
+class Aggregator:
+    """État cumulable d'une statistique ; `state` est sérialisable tel quel en JSON pour le cache."""
+
+    def __init__(self, spec, state=None):
+        self.spec = spec
+        self.kind, value, group = parse_spec(spec)
+        self.value = VALUES[value] if value else None
+        self.group = GROUPS[group] if group else None
+        self.state = state if state is not None else {}
+
+    def slot(self, key):
+        if key not in self.state and len(self.state) >= MAX_GROUPS:
+            key = OTHER
+        return key
+
+    def add(self, movie):
+        keys = self.group(movie) if self.group else [""]
+        if self.kind == "count":
+            for key in keys:
+                key = self.slot(str(key))
+                self.state[key] = self.state.get(key, 0) + 1
+            return
+        value = self.value(movie)
+        if value is None:
+            return
+        for key in keys:
+            key = self.slot(str(key))
+            summary = self.state.get(key)
+            if summary is None:
+                self.state[key] = [1, value, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = min(summary[2], value)
+                summary[3] = max(summary[3], value)
+
+    def result(self):
+        if self.kind == "count":
+            return dict(sorted(self.state.items(), key=lambda kv: (-kv[1], kv[0])))
+        summaries = {
+            key: {"count": n, "sum": total, "min": lo, "max": hi, "mean": total / n}
+            for key, (n, total, lo, hi) in sorted(self.state.items())
+        }
+        return summaries.get("", {}) if self.group is None else summaries
+
+
+def read_cache(path):
+    try:
+        with open(path + STATS_SUFFIX, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cache if cache.get("version") == STATS_VERSION else None
+
+
+def write_cache(path, cache):
+    tmp_path = path + STATS_SUFFIX + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, path + STATS_SUFFIX)
+
+
+def aggregate(specs=DEFAULT_SPECS, path=movie_wiki.INPUT_PATH):
+    """Calcule les statistiques demandées ; renvoie {spec: résultat}."""
+    specs = list(dict.fromkeys(specs))
+    for spec in specs:
+        parse_spec(spec)
+    fingerprint = movie_wiki.source_fingerprint(path)
+    cache = read_cache(path)
+    unchanged = cache is not None and all(cache.get(k) == v for k, v in fingerprint.items())
+    if unchanged and all(spec in cache["states"] for spec in specs):
+        return {spec: Aggregator(spec, cache["states"][spec]).result() for spec in specs}
+
+    # états repris du cache : tels quels si la source n'a pas bougé, complétés par les seuls
+    # films ajoutés si le début de la source (jusqu'au dernier film lu) est identique
+    resume = None
+    if cache is not None and not unchanged:
+        end, digest = cache["prefix"]
+        if end and end <= fingerprint["size"] and movie_wiki.prefix_digest(path, end) == digest:
+            resume = end
+        else:
+            cache = None
+    # tous les états du cache sont repris, même ceux qui ne sont pas demandés cette fois : après
+    # un ajout, ils sont complétés eux aussi pour rester valables jusqu'à la nouvelle fin
+    cached = cache["states"] if cache is not None else {}
+    tail = [Aggregator(spec, state) for spec, state in cached.items()]
+    full = [Aggregator(spec) for spec in specs if spec not in cached]
+
+    end = cache["prefix"][0] if cache is not None else 0
+    start = resume if resume is not None and not full else 0
+    for offset, size, movie in movie_wiki.scan(path, with_offsets=True, start=start):
+        for agg in full:
+            agg.add(movie)
+        if resume is not None and offset >= resume:
+            for agg in tail:
+                agg.add(movie)
+        end = offset + size
+
+    states = {agg.spec: agg.state for agg in tail + full}
+    write_cache(path, dict(fingerprint, version=STATS_VERSION, prefix=[end, movie_wiki.prefix_digest(path, end)],
+                           states=states))
+    aggregators = {agg.spec: agg for agg in tail + full}
+    return {spec: aggregators[spec].result() for spec in specs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistiques sur wiki_movie_plots.json (une seule lecture).")
+    parser.add_argument("specs", nargs="*", default=list(DEFAULT_SPECS),
+                        help="statistiques, par ex. count:origin summary:plot_length:decade")
+    args = parser.parse_args()
+    print(json.dumps(aggregate(args.specs), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
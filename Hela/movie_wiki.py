@@ -1,24 +1,334 @@
+import argparse
+import hashlib
 import json
+import multiprocessing
+import os
+import re
+import sys
+from array import array
+from collections import OrderedDict
+
+# Lecture en flux du tableau JSON : module commun à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json_stream  # noqa: E402
+import movie_query  # noqa: E402
+
+INPUT_PATH = "../input/wiki_movie_plots.json"
+OUTPUT_DIR = "../output"
+OUTPUT_PATH = OUTPUT_DIR + "/british_movies.json"
+OPENERS = json_stream.OPENERS
+EXTENSIONS = json_stream.EXTENSIONS
+CHUNK_SIZE = json_stream.CHUNK_SIZE
+JSON_WS = json_stream.JSON_WS
+INDEX_SUFFIX = ".origin.idx"
+MAX_OPEN_FILES = 64
+WRITE_BUFFER = 1 << 16
+PARALLEL_MIN_BYTES = 32 << 20
+RANGE_MIN_BYTES = 4 << 20
+RECORD_SEPARATOR = re.compile(rb"\}\s*,\s*(\{)")
+
+
+def scan(path=INPUT_PATH, chunk_size=CHUNK_SIZE, with_offsets=False, start=0):
+    """Parcourt le tableau JSON film par film et produit (offset, taille, film) ; voir json_stream.scan."""
+    return json_stream.scan(path, chunk_size, with_offsets, start)
+
+
+def load(path=INPUT_PATH, chunk_size=CHUNK_SIZE):
+    """Lit le tableau JSON film par film (générateur) : la mémoire reste constante."""
+    return (movie for _, _, movie in scan(path, chunk_size))
 
-def load():
-    with open ("../input/wiki_movie_plots.json", "r", encoding="utf-8") as f:
-        return json.load(f)
-    
 
 def classify(movies, origin):
-    return [m for m in movies if m.get("Origin").get("Ethnicity") == origin ]
+    return movie_query.filter_movies(movies, ["origin", "eq", origin])
+
+
+def origin_of(movie):
+    return (movie.get("Origin") or {}).get("Ethnicity")
+
+
+def source_fingerprint(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def prefix_digest(path, size):
+    """SHA-1 des `size` premiers octets de la source (pour vérifier qu'elle n'a fait que grandir)."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while size > 0:
+            block = f.read(min(size, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            size -= len(block)
+    return digest.hexdigest()
+
+
+def build_index(path=INPUT_PATH):
+    """Construit le fichier d'index <source>.origin.idx en une seule lecture de la source.
+
+    Format : une ligne d'en-tête JSON (empreinte de la source, et pour chaque origine
+    sa position et son nombre d'entrées), puis des couples (offset, taille) en int64
+    regroupés par origine.
+    """
+    fingerprint = source_fingerprint(path)
+    entries = {}
+    for offset, size, movie in scan(path, with_offsets=True):
+        origin = origin_of(movie)
+        if origin is not None:
+            entries.setdefault(origin, array("q")).extend((offset, size))
+    origins, start = {}, 0
+    for origin, pairs in entries.items():
+        origins[origin] = [start, len(pairs) // 2]
+        start += len(pairs) // 2
+    header = dict(fingerprint, byteorder=sys.byteorder, origins=origins)
+    index_path = path + INDEX_SUFFIX
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+        for pairs in entries.values():
+            pairs.tofile(f)
+    os.replace(tmp_path, index_path)
+    return header
+
+
+def read_index_header(path=INPUT_PATH):
+    """En-tête de l'index, reconstruit si absent ou si la taille/mtime de la source a changé."""
+    try:
+        with open(path + INDEX_SUFFIX, "rb") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return build_index(path)
+    fingerprint = source_fingerprint(path)
+    if any(header.get(k) != v for k, v in fingerprint.items()) or header.get("byteorder") != sys.byteorder:
+        return build_index(path)
+    return header
+
+
+def origin_offsets(origin, path=INPUT_PATH):
+    """Couples (offset, taille) des films d'une origine, lus directement dans l'index."""
+    header = read_index_header(path)
+    start, count = header["origins"].get(origin, (0, 0))
+    pairs = array("q")
+    if count:
+        with open(path + INDEX_SUFFIX, "rb") as f:
+            f.readline()
+            f.seek(start * 2 * pairs.itemsize, os.SEEK_CUR)
+            pairs.fromfile(f, count * 2)
+    return [(pairs[i], pairs[i + 1]) for i in range(0, len(pairs), 2)]
+
+
+def classify_indexed(origin, path=INPUT_PATH):
+    """Comme classify(load(path), origin) mais ne lit que les films de l'origine demandée."""
+    with open(path, "rb") as f:
+        for offset, size in origin_offsets(origin, path):
+            f.seek(offset)
+            yield json.loads(f.read(size))
+
+def is_record_start(f, start, size, decoder):
+    """Vrai si un film complet (dict avec une clé "Origin") commence à l'octet start."""
+    window = CHUNK_SIZE
+    while True:
+        f.seek(start)
+        text = f.read(window).decode("utf-8", errors="ignore")
+        try:
+            movie, end = decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            if start + window >= size:
+                return False
+            window *= 2
+            continue
+        rest = text[end:].lstrip(JSON_WS)
+        if not rest and start + window < size:
+            window *= 2
+            continue
+        # "Origin" écarte les objets imbriqués ("}, {" peut aussi apparaître dans un film)
+        return isinstance(movie, dict) and "Origin" in movie and rest[:1] in (",", "]")
+
+
+def record_start(f, pos, size):
+    """Octet du premier film qui commence à partir de pos (size s'il n'y en a plus)."""
+    decoder = json.JSONDecoder()
+    while pos < size:
+        f.seek(pos)
+        data = f.read(CHUNK_SIZE)
+        for m in RECORD_SEPARATOR.finditer(data):
+            if is_record_start(f, pos + m.start(1), size, decoder):
+                return pos + m.start(1)
+        if pos + len(data) >= size:
+            break
+        # recouvrement pour ne pas rater un séparateur à cheval sur deux blocs
+        pos += max(1, len(data) - 256)
+    return size
+
+
+def record_ranges(path, parts):
+    """Découpe le fichier en au plus `parts` plages d'octets alignées sur des films.
+
+    Renvoie None si le fichier ne commence pas par un tableau JSON (l'appelant reste en série).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        first = json_stream.array_start(f, CHUNK_SIZE)
+        if first is None:
+            return None
+        step = max(RANGE_MIN_BYTES, (size - first) // max(1, parts))
+        bounds = [first]
+        while bounds[-1] + step < size:
+            start = record_start(f, bounds[-1] + step, size)
+            if start >= size:
+                break
+            bounds.append(start)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def filter_range(task):
+    """Travail d'un processus : décode une plage complète d'un coup et filtre par origine."""
+    path, start, end, last, origin = task
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8").rstrip(JSON_WS)
+    if last:
+        text = text[:-1].rstrip(JSON_WS)
+    text = text.rstrip(",")
+    return [m for m in json.loads("[" + text + "]") if origin_of(m) == origin]
+
+
+def classify_parallel(origin, path=INPUT_PATH, workers=None):
+    """classify(load(path), origin) réparti sur plusieurs processus, dans l'ordre du fichier.
+
+    Les petits fichiers (ou workers=1) restent sur le chemin série.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or os.path.getsize(path) < PARALLEL_MIN_BYTES:
+        yield from classify(load(path), origin)
+        return
+    # plusieurs plages par processus pour équilibrer la charge
+    ranges = record_ranges(path, workers * 4)
+    if ranges is None:
+        # pas de '[' en tête : le chemin série lève l'erreur de json_stream.scan
+        yield from classify(load(path), origin)
+        return
+    tasks = [(path, start, end, i == len(ranges) - 1, origin) for i, (start, end) in enumerate(ranges)]
+    with multiprocessing.Pool(workers) as pool:
+        for movies in pool.imap(filter_range, tasks):
+            yield from movies
+
+
+def output_path(fmt="json", compression=None, base=OUTPUT_DIR + "/british_movies"):
+    """'../output/british_movies' + '.jsonl' + '.gz' selon le format et la compression."""
+    return f"{base}.{fmt}{EXTENSIONS[compression]}"
+
+
+def save(movies, path=OUTPUT_PATH, fmt="json", compression=None):
+    """Écrit les films au fil de l'eau et renvoie leur nombre ; voir json_stream.write.
+
+    fmt vaut "json" (même sortie que json.dump d'une liste) ou "jsonl" ; compression vaut
+    None, "gzip", "bz2" ou "xz". Le fichier final n'apparaît qu'une fois complet.
+    """
+    return json_stream.write(movies, path, fmt, compression)
+
+
+def partition_filename(origin):
+    """'British' -> 'british_movies.json' (même nom que la sortie de main) ; 1999 -> '1999_movies.json'."""
+    slug = re.sub(r"\W+", "_", str(origin).strip().lower()).strip("_") or "unknown"
+    return f"{slug}_movies.json"
+
+
+def partition(movies, output_dir=OUTPUT_DIR, origins=None, max_open=MAX_OPEN_FILES):
+    """Répartit les films dans un fichier JSON par origine en une seule lecture.
+
+    origins limite la répartition à un sous-ensemble (None = toutes les origines).
+    Au plus max_open fichiers restent ouverts : le moins récemment utilisé est fermé
+    puis rouvert en ajout si besoin. Renvoie {origine: nombre de films écrits}.
+    """
+    wanted = set(origins) if origins is not None else None
+    counts, paths = {}, {}
+    used_names = set()
+    handles = OrderedDict()
+    try:
+        for movie in movies:
+            origin = origin_of(movie)
+            if origin is not None and not isinstance(origin, str):
+                origin = str(origin)         # nombre, liste... : une clé de dictionnaire et un nom de fichier
+            if origin is None or (wanted is not None and origin not in wanted):
+                continue
+            f = handles.get(origin)
+            if f is None:
+                if origin not in paths:
+                    name = partition_filename(origin)
+                    base, n = name, 1
+                    while name in used_names:
+                        n += 1
+                        name = base.replace("_movies.json", f"_{n}_movies.json")
+                    used_names.add(name)
+                    paths[origin] = os.path.join(output_dir, name)
+                    counts[origin] = 0
+                if len(handles) >= max_open:
+                    handles.popitem(last=False)[1].close()
+                mode = "a" if counts[origin] else "w"
+                f = handles[origin] = open(paths[origin], mode, encoding="utf-8", buffering=WRITE_BUFFER)
+                if not counts[origin]:
+                    f.write("[")
+            else:
+                handles.move_to_end(origin)
+            if counts[origin]:
+                f.write(", ")
+            json.dump(movie, f)
+            counts[origin] += 1
+    finally:
+        for f in handles.values():
+            f.close()
+    for origin, path in paths.items():
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("]")
+    return counts
 
-def save(movies):
-    with open ("../output/british_movies.json","w",encoding="utf-8") as f:
-        json.dump(movies, f)
 
 def main():
-    movies=load()
-    british_movies=classify(movies, "British")
-    save(british_movies)
+    parser = argparse.ArgumentParser(description="Sélection des films de wiki_movie_plots.json par origine.")
+    parser.add_argument("--partition", nargs="*", metavar="ORIGIN",
+                        help="un fichier par origine dans ../output (toutes si aucune n'est donnée)")
+    parser.add_argument("--workers", type=int,
+                        help="filtre en parallèle sur WORKERS processus (défaut : index par origine)")
+    parser.add_argument("--cache", action="store_true",
+                        help="filtre via le cache colonnaire (movie_cache), reconstruit si la source change")
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json",
+                        help="tableau JSON (défaut) ou JSON Lines, un film par ligne")
+    parser.add_argument("--compress", choices=[c for c in OPENERS if c],
+                        help="compresse la sortie (gzip, bz2 ou xz)")
+    parser.add_argument("--where", type=json.loads, metavar="QUERY",
+                        help='requête JSON (voir movie_query), par ex. \'{"and": [["origin", "eq", "British"], '
+                             '["year", "between", [1990, 1999]]]}\'')
+    args = parser.parse_args()
+    if args.where is not None and args.workers:
+        parser.error("--where ne se combine pas avec --workers")
+    if args.partition is not None:
+        counts = partition(load(), origins=args.partition or None)
+        print(f"{sum(counts.values())} films répartis dans {len(counts)} fichiers")
+        return
+    if args.where is not None:
+        query = args.where
+        path = output_path(args.format, args.compress, OUTPUT_DIR + "/query_movies")
+    else:
+        query = ["origin", "eq", "British"]
+        path = output_path(args.format, args.compress)
+    if args.cache:
+        import movie_cache
+        with movie_cache.MovieCache() as cache:
+            save(movie_query.select(query, cache), path, args.format, args.compress)
+        return
+    if args.where is not None:
+        british_movies=movie_query.filter_movies(load(), query)
+    elif args.workers:
+        british_movies=classify_parallel("British", workers=args.workers)
+    else:
+        british_movies=classify_indexed("British")
+    save(british_movies, path, args.format, args.compress)
 
 if __name__ == "__main__":
     main()
 
 
-    
+
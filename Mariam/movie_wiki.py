@@ -7,34 +7,50 @@
 
 # TODO: Save your python object in a new JSON file located in the `output`folder. 
 import json
+import os
+import sys
+import textwrap
+
+# Lecture en flux du tableau JSON, commune aux trois movie_wiki.py (racine du dépôt)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json_stream  # noqa: E402
+
+TAILLE_BLOC = json_stream.CHUNK_SIZE
 
 def main():
-        def load_movie_list():
-                with open("../input/wiki_movie_plots.json","r", encoding="utf-8") as fichier:
-                        m = json.load(fichier)
-                return m 
+        def load_movie_list(chemin="../input/wiki_movie_plots.json"):
+                # Générateur : les films sont lus un par un, le fichier n'est jamais chargé en entier
+                return (film for _, _, film in json_stream.scan(chemin, TAILLE_BLOC))
 
         def classify(o):
+                # Générateur : affiche les titres et transmet les films au fur et à mesure
                 fichier = load_movie_list()
                 existe = False
                 for film in fichier:
                         if film["Origin"]["Ethnicity"] == o:
                                 print(film["Title"])
                                 existe = True
+                                yield film
                 if not existe:
                         print(f"Aucun film dont l'origine est {o}")
         
-        def save_movie_list(n):
-                fichier = load_movie_list()
-                fichier_dictionnaire =[]
-                for film in fichier:
-                        if film["Origin"]["Ethnicity"] == n:
-                                fichier_dictionnaire.append(film)
+        def save_movie_list(films):
+                nombre = 0
+                # Écriture au fil de l'eau, même rendu que json.dump(liste, indent=4)
                 with open("../output/nouveau_fichier.json", "w", encoding="utf-8") as f:
-                        json.dump(fichier_dictionnaire, f, ensure_ascii=False, indent=4)
+                        f.write("[")
+                        for film in films:
+                                f.write(",\n" if nombre else "\n")
+                                f.write(textwrap.indent(json.dumps(film, ensure_ascii=False, indent=4), "    "))
+                                nombre += 1
+                        f.write("\n]" if nombre else "]")
+                return nombre
         q = "British"
+        # Une seule lecture du fichier : classify alimente directement la sauvegarde
         movie = classify(q)
-        nouveau_fichier = save_movie_list(q)
+        nouveau_fichier = save_movie_list(movie)
+        # Nombre de films sauvegardés (utilisé par bench_movie_wiki.py)
+        return nouveau_fichier
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,100 +7,41 @@ Fonctionnalités :
 - Historique des opérations
 - Créer / supprimer des comptes (utilisateurs)
 - Modification du plafond de retrait
+- Import d'un lot d'opérations (CSV / JSON Lines), avec avancement et annulation
+- Opérations exécutées en arrière-plan (bank_workers.py) : la fenêtre ne se fige jamais
+- Comptes conservés d'un lancement à l'autre (dossier bank_data/, voir bank_storage.py)
 
+Le modèle (Account) et le traitement par lots sont dans bank_engine.py, sans interface.
 """
 
 # --- Imports ---
 import tkinter as tk                         # Tkinter : base de l'interface graphique
-from tkinter import ttk, messagebox          # ttk (widgets modernes) + boîtes de dialogue
-from datetime import datetime                # Pour dater les opérations de l’historique
-import random                                # Pour générer des numéros de compte aléatoires
-
-# --- Constantes par défaut ---
-DEFAULT_BALANCE: float = 2000.0              # Solde initial par défaut
-DEFAULT_LIMIT: float = 1000.0                # Plafond par défaut pour les retraits
-
-# =======================
-#   Modèle : Account
-# =======================
-
-class Account:
-    def __init__(self, holder_name: str, balance: float = DEFAULT_BALANCE, limit: float = DEFAULT_LIMIT) -> None:
-        # Identité du titulaire
-        self.holder_name: str = holder_name
-        # Numéro de compte aléatoire à 10 chiffres
-        self.account_number: int = random.randint(1000000000, 9999999999)
-        # Solde du compte
-        self.balance: float = float(balance)
-        # Plafond de retrait autorisé par opération
-        self.limit: float = float(limit)
-        # Liste d’opérations
-        self.liste_historique: List[dict] = []
-
-    def withdraw(self, amount: float) -> bool:
-        """Retirer de l'argent : vérifie que le montant est > 0, <= limite et <= solde."""
-        amount = float(amount)
-        if amount <= 0:
-            messagebox.showerror("Erreur", "Le montant doit être positif.")
-            return False
-        if amount > self.limit:
-            messagebox.showwarning("Limite dépassée", f"Le montant dépasse la limite de {self.limit:.2f} €.")
-            return False
-        if amount > self.balance:
-            messagebox.showwarning("Solde insuffisant", f"Solde insuffisant ({self.balance:.2f} €).")
-            return False
-        # Décrémenter le solde puis tracer l’opération
-        self.balance -= amount
-        self._historiser("retrait", amount)
-        return True
-
-    def deposit(self, amount: float) -> bool:
-        """Déposer de l'argent : vérifie que le montant est > 0."""
-        amount = float(amount)
-        if amount <= 0:
-            messagebox.showerror("Erreur", "Le montant doit être positif.")
-            return False
-        # Augmenter le solde puis tracer l’opération
-        self.balance += amount
-        self._historiser("depot", amount)
-        return True
-
-    def transfer(self, amount: float, target_account: "Account") -> bool:
-        """Transférer vers un autre compte : retire ici, dépose chez la cible, historise les deux côtés."""
-        amount = float(amount)
-        if self.withdraw(amount):
-            target_account.deposit(amount)
-            self._historiser("transfert_sortant", amount)
-            target_account._historiser("transfert_entrant", amount)
-            return True
-        return False
-
-    def set_limit(self, new_limit: float) -> bool:
-        """Changer le plafond de retrait : doit être strictement positif."""
-        new_limit = float(new_limit)
-        if new_limit <= 0:
-            messagebox.showerror("Erreur", "La limite doit être strictement positive.")
-            return False
-        self.limit = new_limit
-        self._historiser("modif_plafond", new_limit)
-        return True
-
-    def _historiser(self, type_op: str, montant: float) -> None:
-        """Ajouter une ligne dans l'historique (type, montant, date lisible, solde après)."""
-        self.liste_historique.append({
-            "type": type_op,
-            "montant": float(montant),
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "solde_apres": float(self.balance),
-        })
-
-    def __str__(self) -> str:
-        """Représentation texte 'propre' d’un compte."""
-        return (
-            f"{self.holder_name} ({self.account_number})\n"
-            f"Solde : {self.balance:.2f} €\n"
-            f"Plafond de retrait : {self.limit:.2f} €"
-        )
+from tkinter import ttk, messagebox, filedialog  # ttk (widgets modernes) + boîtes de dialogue
+
+# Modèle sans interface : comptes, codes de résultat, traitement par lots
+from bank_engine import (
+    Account, OperationResult, DEFAULT_BALANCE, DEFAULT_LIMIT,
+    INVALID_AMOUNT, LIMIT_EXCEEDED, INSUFFICIENT_FUNDS, INVALID_LIMIT,
+    batch_summary,
+)
+# Persistance : journal d'écriture anticipée + instantanés ; registre indexé des comptes
+from bank_storage import BankStore
+from bank_registry import AccountRegistry
+# Listes virtuelles (seules les lignes visibles sont créées) : comptes filtrables, historique
+from bank_views import AccountListView, VirtualList, history_label
+# Threads de travail : opérations et imports hors du thread de l'interface
+from bank_workers import WorkerPool, import_batch
+
+# Intervalle (ms) entre deux passages de la pompe à résultats des threads de travail (~60 images/s)
+PUMP_MS: int = 16
+
+# Boîte de dialogue affichée pour chaque code d'erreur du moteur : (fonction messagebox, titre)
+ERROR_DIALOGS = {
+    INVALID_AMOUNT: ("showerror", "Erreur"),
+    LIMIT_EXCEEDED: ("showwarning", "Limite dépassée"),
+    INSUFFICIENT_FUNDS: ("showwarning", "Solde insuffisant"),
+    INVALID_LIMIT: ("showerror", "Erreur"),
+}
 
 # =======================
 #   Bank App
@@ -112,11 +53,19 @@ class BankApp(tk.Tk):
         # Titre et taille de la fenêtre
         self.title("Gestion de Comptes Bancaires")
         self.geometry("680x400")
-        # Dictionnaire des comptes (clé = nom du titulaire, valeur = objet Account)
-        self.accounts: Dict[str, Account] = {
-            "Ross": Account("Ross"),
-            "Rachel": Account("Rachel"),
-        }
+        # Comptes persistants : dernier instantané + rejeu du journal (bank_data/)
+        self.store = BankStore()
+        if not self.store.accounts:
+            # Premier lancement : comptes de démonstration
+            for name in ("Ross", "Rachel"):
+                self.store.create_account(name)
+        # Registre des comptes (clé = numéro de compte, unique ; deux titulaires homonymes ne s'écrasent plus)
+        self.accounts: AccountRegistry = self.store.accounts
+        # Pool de threads de travail ; leurs résultats sont traités ici, par la pompe self.after()
+        self.workers = WorkerPool(on_error=self._on_worker_error)
+        self.after(PUMP_MS, self._pump_workers)
+        # Fermeture de la fenêtre : arrêt des threads puis fsync final du journal
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         # Construit tout l’UI puis sélectionne automatiquement un compte au démarrage
         self._build_ui()
         self._select_first_account()
@@ -131,17 +80,12 @@ class BankApp(tk.Tk):
         left = ttk.Frame(container)
         left.grid(row=0, column=0, sticky="nsw", padx=(0, 10))
 
-        ttk.Label(left, text="Comptes :").pack(anchor="w")
-
-        # StringVar liée à la Listbox : quand on change acc_var, la liste se met à jour
-        self.acc_var = tk.StringVar(value=list(self.accounts.keys()))
-
-        # Listbox montrant les noms des comptes
-        self.listbox = tk.Listbox(left, listvariable=self.acc_var, height=10, exportselection=False, width=22)
-        self.listbox.pack(fill="y")
+        ttk.Label(left, text="Comptes (taper le début d’un nom pour filtrer) :").pack(anchor="w")
 
-        # À chaque changement de sélection dans la liste, on rafraîchit le panneau d’infos
-        self.listbox.bind("<<ListboxSelect>>", lambda _e: self._refresh_info_panel())
+        # Liste virtuelle des comptes (titulaire + numéro) avec champ de filtre ;
+        # à chaque changement de sélection, on rafraîchit le panneau d’infos
+        self.account_view = AccountListView(left, self.accounts, on_select=self._refresh_info_panel)
+        self.account_view.pack(fill="y", expand=True)
 
         # Cadre pour les boutons liés aux comptes
         actions = ttk.Frame(left)
@@ -176,6 +120,7 @@ class BankApp(tk.Tk):
         ttk.Button(right, text="🔁 Transférer",  command=self._on_transfer).grid( row=4, column=0, sticky="we", pady=5)
         ttk.Button(right, text="📜 Historique",  command=self._on_show_history).grid(row=4, column=1, sticky="we", pady=5)
         ttk.Button(right, text="⚙️ Modifier le plafond", command=self._on_set_limit).grid(row=5, column=0, sticky="we", pady=5)
+        ttk.Button(right, text="📂 Importer un lot", command=self._on_import_batch).grid(row=5, column=1, sticky="we", pady=5)
 
         # Barre de statut en bas (messages utilisateur)
         self.status = ttk.Label(self, relief=tk.SUNKEN, anchor="w")
@@ -183,20 +128,16 @@ class BankApp(tk.Tk):
 
     def _select_first_account(self) -> None:
         """Sélectionne le premier compte de la liste au démarrage (si la liste n’est pas vide) puis met à jour l’affichage."""
-        if self.listbox.size() > 0:              # size() = nombre d’éléments dans la Listbox
-            self.listbox.selection_set(0)         # sélectionne l’élément d’index 0 (premier)
+        self.account_view.select_first()          # sélectionne le premier compte (s’il y en a un)
         self._refresh_info_panel()                # met à jour le panneau d’infos à droite
 
     def _selected_account(self) -> Account:
         """Retourne l’objet Account correspondant à la sélection actuelle dans la Listbox."""
-        sel = self.listbox.curselection()         # tuple d’indices sélectionnés (ex: (0,))
-        name = self.listbox.get(sel[0])           # récupère le nom affiché à l’index sélectionné
-        return self.accounts.get(name)            # retourne l’objet Account stocké dans le dict
-
-    def _refresh_accounts_list(self, select_name: str = None) -> None:
-        """Recharge la Listbox à partir du dictionnaire self.accounts (sans gérer ici la sélection)."""
-        names = list(self.accounts.keys())        # liste des noms (clés du dict)
-        self.acc_var.set(names)                   # met à jour la Listbox via la StringVar liée
+        return self.account_view.selected_account()
+
+    def _refresh_accounts_list(self, select_number: int = None) -> None:
+        """Relit le registre self.accounts (seules les lignes visibles sont recréées)."""
+        self.account_view.refresh(select_number)  # garde la sélection, ou sélectionne le compte créé
         self._refresh_info_panel()                # met à jour le panneau d’infos (au cas où)
 
     def _refresh_info_panel(self) -> None:
@@ -209,9 +150,26 @@ class BankApp(tk.Tk):
             self.status.config(text=f"Compte sélectionné : {acc.holder_name}")  # met à jour la barre d’état
         self.info_text.config(state="disabled")   # repasse en lecture seule (empêche l’édition manuelle)
 
+    def _show_error(self, result: OperationResult) -> None:
+        """Affiche la boîte de dialogue correspondant au code d'erreur renvoyé par le moteur."""
+        kind, title = ERROR_DIALOGS.get(result.code, ("showerror", "Erreur"))
+        getattr(messagebox, kind)(title, result.message)
+
     # =======================
     #  Actions
     # =======================
+    def _pump_workers(self) -> None:
+        """Exécute les rappels des tâches terminées (budget de temps limité), puis se reprogramme."""
+        try:
+            self.workers.pump()
+        finally:
+            # Reprogrammée même si un rappel a levé une exception : les suivants seront livrés
+            self.after(PUMP_MS, self._pump_workers)
+
+    def _on_worker_error(self, exc: BaseException) -> None:
+        """Erreur inattendue dans un thread de travail : affichée au lieu d'être perdue."""
+        messagebox.showerror("Erreur", f"L’opération a échoué : {exc}")
+
     def _on_add_account(self) -> None:
         """Ouvre une fenêtre pour saisir un nouveau compte (nom + solde) puis le crée."""
 
@@ -221,20 +179,21 @@ class BankApp(tk.Tk):
             if not name:
                 messagebox.showerror("Erreur", "Le nom du titulaire est obligatoire.")
                 return
+            # Création (journalisée) : le registre attribue un numéro unique, même pour un homonyme ;
+            # un solde non numérique ou non fini ("nan", "inf") lève ValueError
             try:
                 balance = float(entry_balance.get())
+                acc = self.store.create_account(name, balance, DEFAULT_LIMIT)
             except ValueError:
                 messagebox.showerror("Erreur", "Solde initial invalide.")
                 return
 
-            # Création et enregistrement du compte dans le dictionnaire
-            self.accounts[name] = Account(name, balance, DEFAULT_LIMIT)
-
             # Rafraîchir la liste
-            self._refresh_accounts_list(select_name=name)
+            self._refresh_accounts_list(select_number=acc.account_number)
 
             # Message utilisateur dans la barre de statut (montants formatés 2 décimales)
-            self.status.config(text=f"✅ Compte '{name}' créé (solde {balance:.2f} €, plafond {DEFAULT_LIMIT:.2f} €).")
+            self.status.config(text=f"✅ Compte '{name}' n° {acc.account_number} créé "
+                                    f"(solde {balance:.2f} €, plafond {DEFAULT_LIMIT:.2f} €).")
 
             # Fermer la fenêtre d’ajout
             add_win.destroy()
@@ -270,8 +229,8 @@ class BankApp(tk.Tk):
         # Confirmation utilisateur
         if not messagebox.askyesno("Confirmation", f"Supprimer le compte '{acc.holder_name}' ?"):
             return
-        # Suppression dans le dictionnaire puis rafraîchissement
-        del self.accounts[acc.holder_name]
+        # Suppression (journalisée, retire aussi le compte du registre) puis rafraîchissement
+        self.store.delete_account(acc)
         self._refresh_accounts_list()
         self.status.config(text=f"🗑️ Compte '{acc.holder_name}' supprimé.")
 
@@ -283,9 +242,17 @@ class BankApp(tk.Tk):
         except ValueError:
             messagebox.showerror("Erreur", "Montant invalide.")
             return
-        if acc.deposit(amt):
-            self.status.config(text=f"💰 {amt:.2f} € déposés sur {acc.holder_name}.")
-            self._refresh_info_panel()            # réaffiche solde/plafond mis à jour
+
+        def done(result: OperationResult) -> None:
+            if result:
+                self.status.config(text=f"💰 {amt:.2f} € déposés sur {acc.holder_name}.")
+                self._refresh_info_panel()        # réaffiche solde/plafond mis à jour
+            else:
+                self._show_error(result)
+
+        # Dépôt (et écriture dans le journal) sur le thread des opérations, dans l'ordre des clics ;
+        # done() revient ici
+        self.workers.run_serial(acc.deposit, amt, on_done=done)
         self.amount_entry.delete(0, tk.END)       # vide le champ de saisie
 
     def _on_withdraw(self) -> None:
@@ -296,9 +263,15 @@ class BankApp(tk.Tk):
         except ValueError:
             messagebox.showerror("Erreur", "Montant invalide.")
             return
-        if acc.withdraw(amt):
-            self.status.config(text=f"💸 {amt:.2f} € retirés de {acc.holder_name}.")
-            self._refresh_info_panel()
+
+        def done(result: OperationResult) -> None:
+            if result:
+                self.status.config(text=f"💸 {amt:.2f} € retirés de {acc.holder_name}.")
+                self._refresh_info_panel()
+            else:
+                self._show_error(result)
+
+        self.workers.run_serial(acc.withdraw, amt, on_done=done)
         self.amount_entry.delete(0, tk.END)
 
     def _on_transfer(self) -> None:
@@ -312,36 +285,39 @@ class BankApp(tk.Tk):
             except ValueError:
                 messagebox.showerror("Erreur", "Montant invalide.")
                 return
-            # Vérifier qu’une cible est sélectionnée
-            sel = target_list.curselection()
-            if not sel:
-                messagebox.showwarning("Erreur", "Choisissez un compte destinataire.")
+            # Vérifier qu’une cible (autre que la source) est sélectionnée
+            target_acc = target_view.selected_account()
+            if target_acc is None or target_acc is source:
+                messagebox.showwarning("Erreur", "Choisissez un autre compte destinataire.")
                 return
-            # Récupérer le nom et l’objet Account du destinataire
-            target_name = targets[sel[0]]
-            target_acc = self.accounts[target_name]
-            # Exécuter le transfert + rafraîchissement + fermeture
-            if source.transfer(amt, target_acc):
-                self.status.config(text=f"🔁 {amt:.2f} € transférés de {source.holder_name} à {target_acc.holder_name}.")
-                self._refresh_info_panel()
-                transfer_win.destroy()
+
+            def done(result: OperationResult) -> None:
+                # Rafraîchissement + fermeture (si la fenêtre est encore ouverte)
+                if result:
+                    self.status.config(text=f"🔁 {amt:.2f} € transférés de {source.holder_name} à {target_acc.holder_name}.")
+                    self._refresh_info_panel()
+                    if transfer_win.winfo_exists():
+                        transfer_win.destroy()
+                else:
+                    self._show_error(result)
+
+            # Exécuter le transfert sur un thread de travail
+            self.workers.run_serial(source.transfer, amt, target_acc, on_done=done)
 
         # --- Fenêtre de transfert ---
         transfer_win = tk.Toplevel(self)
         transfer_win.title("Transfert")
-        transfer_win.geometry("280x190")
+        transfer_win.geometry("300x300")
         transfer_win.resizable(False, False)
 
         ttk.Label(transfer_win, text="Montant (€) :").pack(pady=(10, 4))
         entry_amount = ttk.Entry(transfer_win)     # champ montant
         entry_amount.pack(pady=4, fill="x", padx=12)
 
-        ttk.Label(transfer_win, text="Vers le compte :").pack(pady=(10, 4))
-        # Liste des noms cibles (tous les comptes sauf la source)
-        targets = [name for name in self.accounts if name != source.holder_name]
-        target_var = tk.StringVar(value=targets)
-        target_list = tk.Listbox(transfer_win, listvariable=target_var, height=min(6, len(targets)), exportselection=False)
-        target_list.pack(padx=12, fill="x")
+        ttk.Label(transfer_win, text="Vers le compte (taper le début du nom) :").pack(pady=(10, 4))
+        # Comptes cibles : même liste virtuelle filtrable que la fenêtre principale
+        target_view = AccountListView(transfer_win, self.accounts, height=6)
+        target_view.pack(padx=12, fill="both", expand=True)
 
         ttk.Button(transfer_win, text="Transférer", command=do_transfer).pack(pady=12)
 
@@ -355,21 +331,13 @@ class BankApp(tk.Tk):
         hist_win.geometry("460x260")
         hist_win.resizable(True, True)
 
-        # Listbox pour lister chaque opération
-        hist_list = tk.Listbox(hist_win)
+        # Liste virtuelle : seules les lignes visibles sont lues dans l’historique et mises en forme,
+        # l’ouverture ne dépend donc pas de la longueur de l’historique (message dédié s’il est vide)
+        ledger = acc.liste_historique
+        hist_list = VirtualList(hist_win, count=lambda: len(ledger), row=lambda i: history_label(ledger.entry(i)),
+                                empty_text="Aucune opération enregistrée.")
         hist_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        # Si aucun historique, message dédié
-        if not acc.liste_historique:
-            hist_list.insert(tk.END, "Aucune opération enregistrée.")
-            return
-
-        # Sinon, on affiche chaque ligne formatée
-        for op in acc.liste_historique:
-            hist_list.insert(
-                tk.END,
-                f"{op['date']} | {op['type']} | {op['montant']:.2f} € | Solde: {op['solde_apres']:.2f} €"
-            )
+        hist_list.render()
 
     def _on_set_limit(self) -> None:
         """Ouvre une fenêtre pour modifier le plafond du compte sélectionné."""
@@ -382,11 +350,18 @@ class BankApp(tk.Tk):
             except ValueError:
                 messagebox.showerror("Erreur", "Montant invalide.")
                 return
-            # Si la mise à jour est valide, on actualise
-            if acc.set_limit(new_limit):
-                self.status.config(text=f"⚙️ Nouveau plafond de {acc.holder_name} : {new_limit:.2f} €")
-                self._refresh_info_panel()
-                limit_win.destroy()
+
+            def done(result: OperationResult) -> None:
+                # Si la mise à jour est valide, on actualise
+                if result:
+                    self.status.config(text=f"⚙️ Nouveau plafond de {acc.holder_name} : {new_limit:.2f} €")
+                    self._refresh_info_panel()
+                    if limit_win.winfo_exists():
+                        limit_win.destroy()
+                else:
+                    self._show_error(result)
+
+            self.workers.run_serial(acc.set_limit, new_limit, on_done=done)
 
         # --- Fenêtre de modification du plafond ---
         limit_win = tk.Toplevel(self)
@@ -401,6 +376,65 @@ class BankApp(tk.Tk):
 
         ttk.Button(limit_win, text="Appliquer", command=apply_limit).pack(pady=12)
 
+    def _on_import_batch(self) -> None:
+        """Applique un fichier d'opérations (CSV ou JSON Lines) en arrière-plan, avec avancement et annulation."""
+        path = filedialog.askopenfilename(
+            title="Importer un lot d'opérations",
+            filetypes=[("Opérations", "*.csv *.jsonl *.ndjson"), ("Tous les fichiers", "*.*")],
+        )
+        if not path:
+            return
+
+        def finished(outcome) -> None:
+            errors, processed = outcome
+            if progress_win.winfo_exists():
+                progress_win.destroy()
+            self._refresh_info_panel()
+            if errors:
+                details = ", ".join(f"{code} : {n}" for code, n in batch_summary(errors).items())
+                first_line, first = errors[0]
+                messagebox.showwarning(
+                    "Lot importé avec des erreurs",
+                    f"{len(errors)} ligne(s) rejetée(s) ({details}).\nPremière erreur, ligne {first_line} : {first.message}",
+                )
+            if job.cancelled:
+                self.status.config(text=f"⏹️ Import annulé après {processed} ligne(s) : {path} ({len(errors)} erreur(s)).")
+            else:
+                self.status.config(text=f"📂 Lot importé : {path} ({len(errors)} erreur(s)).")
+
+        # Import sur un thread de travail (un fsync du journal par paquet de lignes)
+        job = self.workers.start_job(import_batch, self.accounts, path, self.store.group_commit, on_done=finished)
+
+        # --- Fenêtre d’avancement ---
+        progress_win = tk.Toplevel(self)
+        progress_win.title("📂 Import en cours")
+        progress_win.geometry("320x130")
+        progress_win.resizable(False, False)
+        progress_win.protocol("WM_DELETE_WINDOW", job.cancel)   # fermer = annuler
+        progress_label = ttk.Label(progress_win, text="Préparation…")
+        progress_label.pack(pady=(12, 6))
+        progress_bar = ttk.Progressbar(progress_win, mode="determinate", maximum=100)
+        progress_bar.pack(fill="x", padx=16)
+        ttk.Button(progress_win, text="⏹️ Annuler", command=job.cancel).pack(pady=10)
+
+        def update_progress() -> None:
+            # Relit l’avancement publié par la tâche (~10 fois par seconde) ; le solde affiché suit l’import
+            if job.finished or not progress_win.winfo_exists():
+                return
+            progress_bar["value"] = job.fraction * 100
+            progress_label.config(text=f"{job.done} / {job.total if job.total is not None else '?'} ligne(s)"
+                                       + (" — annulation…" if job.cancelled else ""))
+            self._refresh_info_panel()
+            progress_win.after(100, update_progress)
+
+        update_progress()
+
+    def _on_close(self) -> None:
+        """Arrête les threads de travail (annule un import en cours), rend le journal durable puis ferme la fenêtre."""
+        self.workers.shutdown()
+        self.store.close()
+        self.destroy()
+
 # =======================
 #   Point d’entrée
 # =======================
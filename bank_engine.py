@@ -0,0 +1,250 @@
+"""
+Moteur de comptes bancaires (sans interface graphique)
+---------------------------------------------------------
+Fonctionnalités :
+- Modèle Account : dépôt, retrait (avec plafond), transfert, modification du plafond
+- Chaque opération renvoie un OperationResult (succès, code d'erreur, message)
+  au lieu d'ouvrir une boîte de dialogue : utilisable sans écran
+- Traitement par lots : applique un fichier CSV ou JSON Lines d'opérations en un appel
+  et renvoie le résultat de chaque ligne
+- Utilisable depuis plusieurs threads : un verrou par compte ; un transfert verrouille
+  ses deux comptes dans l'ordre des numéros de compte (pas d'interblocage) et s'applique
+  en entier ou pas du tout
+
+"""
+
+# --- Imports ---
+import csv
+import json
+import math
+import random                                # Pour générer des numéros de compte aléatoires
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bank_ledger import Ledger               # Historique compact (tableaux typés, dates formatées à l'affichage)
+
+# --- Constantes par défaut ---
+DEFAULT_BALANCE: float = 2000.0              # Solde initial par défaut
+DEFAULT_LIMIT: float = 1000.0                # Plafond par défaut pour les retraits
+
+# --- Codes de résultat ---
+OK = "ok"
+INVALID_AMOUNT = "montant_invalide"          # montant <= 0
+LIMIT_EXCEEDED = "limite_depassee"           # retrait au-delà du plafond
+INSUFFICIENT_FUNDS = "solde_insuffisant"     # retrait au-delà du solde
+INVALID_LIMIT = "limite_invalide"            # nouveau plafond <= 0
+UNKNOWN_ACCOUNT = "compte_inconnu"           # (lots) titulaire absent
+INVALID_ROW = "ligne_invalide"               # (lots) ligne illisible ou opération inconnue
+
+# =======================
+#   Résultat d'opération
+# =======================
+
+@dataclass(frozen=True)
+class OperationResult:
+    code: str = OK
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.code == OK
+
+    def __bool__(self) -> bool:
+        """Un résultat est « vrai » si l'opération a réussi (compatible avec `if acc.deposit(...)`)."""
+        return self.ok
+
+
+SUCCESS = OperationResult()
+
+# =======================
+#   Modèle : Account
+# =======================
+
+class Account:
+    def __init__(self, holder_name: str, balance: float = DEFAULT_BALANCE, limit: float = DEFAULT_LIMIT,
+                 account_number: Optional[int] = None) -> None:
+        balance, limit = float(balance), float(limit)
+        # nan/inf casseraient les comparaisons et l'index des soldes du registre : refusés dès la création
+        if not (math.isfinite(balance) and math.isfinite(limit)):
+            raise ValueError(f"solde ou plafond non fini : {balance!r}, {limit!r}")
+        # Identité du titulaire
+        self.holder_name: str = holder_name
+        # Numéro de compte (aléatoire à 10 chiffres s'il n'est pas fourni ; garanti unique s'il vient
+        # de AccountRegistry.allocate_number, ou rechargé depuis le disque)
+        self.account_number: int = account_number if account_number is not None else random.randint(1000000000, 9999999999)
+        # Solde du compte
+        self.balance: float = balance
+        # Plafond de retrait autorisé par opération
+        self.limit: float = limit
+        # Historique des opérations
+        self.liste_historique: Ledger = Ledger()
+        # Journal de persistance (bank_storage.BankStore) : reçoit chaque modification, None = en mémoire seulement
+        self.journal = None
+        # Verrou du compte (réentrant : transfer appelle withdraw et deposit)
+        self._lock = threading.RLock()
+        # Registre qui indexe ce compte (bank_registry.AccountRegistry), prévenu de chaque changement de solde
+        self.registry = None
+
+    def _operation(self):
+        """Délimite une opération pour le journal : un transfert (retrait + dépôt) y est écrit d'un seul bloc."""
+        return self.journal.operation() if self.journal is not None else nullcontext()
+
+    def check_withdraw(self, amount: float) -> OperationResult:
+        """Vérifie qu'un retrait est possible (montant > 0, <= limite et <= solde) sans rien modifier."""
+        if not math.isfinite(amount) or amount <= 0:     # nan passerait toutes les comparaisons
+            return OperationResult(INVALID_AMOUNT, "Le montant doit être positif.")
+        if amount > self.limit:
+            return OperationResult(LIMIT_EXCEEDED, f"Le montant dépasse la limite de {self.limit:.2f} €.")
+        if amount > self.balance:
+            return OperationResult(INSUFFICIENT_FUNDS, f"Solde insuffisant ({self.balance:.2f} €).")
+        return SUCCESS
+
+    def withdraw(self, amount: float) -> OperationResult:
+        """Retirer de l'argent : vérifie que le montant est > 0, <= limite et <= solde."""
+        amount = float(amount)
+        # Vérifier, décrémenter le solde puis tracer l'opération sans qu'un autre thread s'intercale
+        with self._lock:
+            result = self.check_withdraw(amount)
+            if not result:
+                return result
+            with self._operation():
+                self.balance -= amount
+                self._historiser("retrait", amount)
+        return SUCCESS
+
+    def deposit(self, amount: float) -> OperationResult:
+        """Déposer de l'argent : vérifie que le montant est > 0."""
+        amount = float(amount)
+        if not math.isfinite(amount) or amount <= 0:
+            return OperationResult(INVALID_AMOUNT, "Le montant doit être positif.")
+        # Augmenter le solde puis tracer l'opération
+        with self._lock, self._operation():
+            self.balance += amount
+            self._historiser("depot", amount)
+        return SUCCESS
+
+    def transfer(self, amount: float, target_account: "Account") -> OperationResult:
+        """Transférer vers un autre compte : retire ici, dépose chez la cible, historise les deux côtés.
+
+        Les deux comptes restent verrouillés pendant tout le transfert, toujours dans l'ordre
+        croissant des numéros de compte (puis de id() pour deux comptes hors registre de même
+        numéro) : deux transferts croisés ne peuvent pas s'attendre.
+        """
+        amount = float(amount)
+        first, second = sorted((self, target_account), key=lambda acc: (acc.account_number, id(acc)))
+        with first._lock, second._lock, self._operation():
+            result = self.withdraw(amount)
+            if result:
+                target_account.deposit(amount)
+                self._historiser("transfert_sortant", amount)
+                target_account._historiser("transfert_entrant", amount)
+        return result
+
+    def set_limit(self, new_limit: float) -> OperationResult:
+        """Changer le plafond de retrait : doit être strictement positif."""
+        new_limit = float(new_limit)
+        if not math.isfinite(new_limit) or new_limit <= 0:
+            return OperationResult(INVALID_LIMIT, "La limite doit être strictement positive.")
+        with self._lock, self._operation():
+            self.limit = new_limit
+            self._historiser("modif_plafond", new_limit)
+        return SUCCESS
+
+    def _historiser(self, type_op: str, montant: float) -> None:
+        """Ajouter une ligne dans l'historique (type, montant, horodatage, solde après) et la journaliser."""
+        timestamp = time.time()
+        self.liste_historique.append(type_op, float(montant), self.balance, timestamp)
+        if self.registry is not None:
+            self.registry.balance_changed(self)
+        if self.journal is not None:
+            self.journal.record_history(self, type_op, float(montant), timestamp)
+
+    def __str__(self) -> str:
+        """Représentation texte 'propre' d'un compte."""
+        return (
+            f"{self.holder_name} ({self.account_number})\n"
+            f"Solde : {self.balance:.2f} €\n"
+            f"Plafond de retrait : {self.limit:.2f} €"
+        )
+
+# =======================
+#   Traitement par lots
+# =======================
+
+# Opérations acceptées dans un lot (noms des méthodes d'Account)
+BATCH_OPERATIONS: Tuple[str, ...] = ("deposit", "withdraw", "transfer", "set_limit")
+
+
+def read_operations(path: str) -> Iterator[dict]:
+    """Lit un fichier d'opérations ligne par ligne (sans tout charger).
+
+    - .csv : en-tête op,account,amount,target (target seulement pour transfer)
+    - .jsonl / .ndjson : un objet {"op": ..., "account": ..., "amount": ..., "target": ...} par ligne
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {"op": None}
+
+
+def apply_operation(accounts: Dict[str, Account], row: dict) -> OperationResult:
+    """Applique une opération de lot (dict op/account/amount/target).
+
+    `accounts` : dict titulaire -> Account, ou AccountRegistry (numéro, ou titulaire s'il est unique).
+    """
+    op = row.get("op")
+    if op not in BATCH_OPERATIONS:
+        return OperationResult(INVALID_ROW, f"Opération inconnue : {op!r}.")
+    try:
+        amount = float(row.get("amount"))
+    except (TypeError, ValueError):
+        return OperationResult(INVALID_ROW, f"Montant invalide : {row.get('amount')!r}.")
+    if not math.isfinite(amount):
+        return OperationResult(INVALID_AMOUNT, f"Montant invalide : {row.get('amount')!r}.")
+    try:
+        account = accounts.get(row.get("account"))
+        target = accounts.get(row.get("target")) if op == "transfer" else None
+    except TypeError:                        # ex. "account": [] dans une ligne JSON
+        return OperationResult(INVALID_ROW, f"Compte invalide : {row.get('account')!r} / {row.get('target')!r}.")
+    if account is None:
+        return OperationResult(UNKNOWN_ACCOUNT, f"Compte inconnu : {row.get('account')!r}.")
+    if op == "transfer":
+        if target is None:
+            return OperationResult(UNKNOWN_ACCOUNT, f"Compte destinataire inconnu : {row.get('target')!r}.")
+        return account.transfer(amount, target)
+    return getattr(account, op)(amount)
+
+
+def iter_batch(accounts: Dict[str, Account], rows: Iterable[dict]) -> Iterator[Tuple[int, OperationResult]]:
+    """Applique les opérations dans l'ordre et produit (numéro de ligne à partir de 1, résultat)."""
+    for number, row in enumerate(rows, start=1):
+        yield number, apply_operation(accounts, row)
+
+
+def apply_batch(accounts: Dict[str, Account], path: str,
+                errors_only: bool = False) -> List[Tuple[int, OperationResult]]:
+    """Applique tout un fichier d'opérations en un appel ; renvoie le résultat de chaque ligne.
+
+    errors_only=True ne garde que les lignes en échec (utile pour de très gros lots).
+    """
+    return [(n, r) for n, r in iter_batch(accounts, read_operations(path)) if not (errors_only and r)]
+
+
+def batch_summary(results: Iterable[Tuple[int, OperationResult]]) -> Dict[str, int]:
+    """Nombre de lignes par code de résultat."""
+    summary: Dict[str, int] = {}
+    for _, result in results:
+        summary[result.code] = summary.get(result.code, 0) + 1
+    return summary
@@ -0,0 +1,280 @@
+"""
+Traitement de fin de journée sur tous les comptes
+---------------------------------------------------------
+- Soldes et plafonds copiés dans des tableaux numériques contigus (NumPy s'il est installé,
+  module array sinon), puis règles appliquées à tous les comptes en un seul passage :
+  intérêts du jour sur le solde, frais de tenue de compte sous un solde minimum,
+  plafonds de retrait ramenés entre deux bornes
+- Seuls les comptes modifiés sont ensuite touchés : lignes d'historique (interets, frais,
+  modif_plafond) ajoutées en bloc avec un seul horodatage, journalisées compte par compte
+  sous le verrou du compte (une ligne de journal par compte, un seul fsync pour tout le
+  traitement), index des soldes du registre reconstruit en un seul tri
+- Une opération arrivée sur un compte à modifier entre la copie des tableaux et
+  l'application est prise en compte : les règles sont recalculées pour ce compte, sous son
+  verrou (un compte sans rien à appliquer au moment de la copie n'est pas revisité)
+- Mesures (EodReport) : durée de chaque phase et latence des paquets, c'est-à-dire le temps
+  pendant lequel une opération concurrente peut attendre le traitement
+
+Exemple :
+    python bank_eod.py --rate 0.02 --fee 2 --fee-below 100 --limit-max 5000
+"""
+
+# --- Imports ---
+import argparse
+import time
+from array import array
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bank_engine import Account
+from bank_ledger import OP_CODES, OP_TYPES
+from bank_storage import BankStore, DATA_DIR
+
+try:
+    import numpy as np
+except ImportError:                          # repli : tableaux du module array et boucles Python
+    np = None
+
+# --- Constantes par défaut ---
+CHUNK_ACCOUNTS: int = 10_000                 # comptes modifiés par paquet (unité de mesure des latences)
+DAYS_PER_YEAR: int = 365                     # intérêts : taux annuel / DAYS_PER_YEAR par jour
+
+INTEREST_CODE = OP_CODES["interets"]
+FEE_CODE = OP_CODES["frais"]
+LIMIT_CODE = OP_CODES["modif_plafond"]
+
+# =======================
+#   Règles et rapport
+# =======================
+
+@dataclass(frozen=True)
+class EodRules:
+    annual_rate: float = 0.0                 # taux d'intérêt annuel (0.02 = 2 %), sur les soldes positifs
+    fee: float = 0.0                         # frais prélevés sur les comptes sous `fee_below`
+    fee_below: float = 0.0                   # solde minimum (après intérêts) pour échapper aux frais
+    limit_min: Optional[float] = None        # plafonds de retrait ramenés dans [limit_min, limit_max]
+    limit_max: Optional[float] = None
+
+    @property
+    def daily_rate(self) -> float:
+        return self.annual_rate / DAYS_PER_YEAR
+
+
+@dataclass
+class EodReport:
+    backend: str                             # "numpy" ou "array"
+    accounts: int = 0
+    changed: int = 0                         # comptes avec au moins une ligne d'historique
+    rows: int = 0                            # lignes d'historique ajoutées
+    interest: float = 0.0                    # total des intérêts versés
+    fees: float = 0.0                        # total des frais prélevés
+    limits_changed: int = 0
+    recomputed: int = 0                      # comptes modifiés pendant le traitement, règles recalculées
+    timings: Dict[str, float] = field(default_factory=dict)   # phase -> secondes
+    chunk_latencies: List[float] = field(default_factory=list)
+
+    def latency(self, quantile: float) -> float:
+        """Latence d'un paquet (secondes) au quantile donné (0.99 = p99)."""
+        if not self.chunk_latencies:
+            return 0.0
+        ordered = sorted(self.chunk_latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def __str__(self) -> str:
+        phases = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.timings.items())
+        return (
+            f"{self.accounts} comptes ({self.backend}), {self.changed} modifiés, {self.rows} lignes\n"
+            f"Intérêts : {self.interest:.2f} €, frais : {self.fees:.2f} €, plafonds modifiés : {self.limits_changed}\n"
+            f"Phases : {phases}\n"
+            f"Paquets : p50 {self.latency(0.5) * 1000:.1f} ms, p99 {self.latency(0.99) * 1000:.1f} ms"
+        )
+
+# =======================
+#   Calcul vectorisé
+# =======================
+
+def _compute_numpy(balances, limits, rules: EodRules):
+    interest = np.round(np.maximum(balances, 0.0) * rules.daily_rate, 2)
+    after = balances + interest
+    fees = np.where(after < rules.fee_below, np.minimum(rules.fee, np.maximum(after, 0.0)), 0.0)
+    new_limits = np.clip(limits,
+                         -np.inf if rules.limit_min is None else rules.limit_min,
+                         np.inf if rules.limit_max is None else rules.limit_max)
+    changed = np.flatnonzero((interest != 0) | (fees != 0) | (new_limits != limits))
+    return interest, fees, new_limits, changed
+
+
+def _compute_array(balances: Sequence[float], limits: Sequence[float], rules: EodRules):
+    rate, fee, fee_below = rules.daily_rate, rules.fee, rules.fee_below
+    low = float("-inf") if rules.limit_min is None else rules.limit_min
+    high = float("inf") if rules.limit_max is None else rules.limit_max
+    interest = array("d", [round(b * rate, 2) if b > 0 else 0.0 for b in balances])
+    fees = array("d", [min(fee, max(b + i, 0.0)) if b + i < fee_below else 0.0
+                       for b, i in zip(balances, interest)])
+    new_limits = array("d", [min(max(limit, low), high) for limit in limits])
+    changed = [k for k, (i, f, old, new) in enumerate(zip(interest, fees, limits, new_limits))
+               if i or f or old != new]
+    return interest, fees, new_limits, changed
+
+
+def compute(balances: Sequence[float], limits: Sequence[float], rules: EodRules,
+            use_numpy: Optional[bool] = None) -> Tuple[Sequence[float], Sequence[float], Sequence[float], Sequence[int]]:
+    """Applique les règles à des tableaux de soldes et de plafonds.
+
+    Renvoie (intérêts, frais, nouveaux plafonds, indices des comptes modifiés) ; ne touche à aucun compte.
+    use_numpy=None : NumPy s'il est installé.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise RuntimeError("NumPy n'est pas installé")
+        return _compute_numpy(np.asarray(balances, dtype=float), np.asarray(limits, dtype=float), rules)
+    return _compute_array(balances, limits, rules)
+
+# =======================
+#   Traitement
+# =======================
+
+def run_end_of_day(accounts: Iterable[Account], rules: EodRules, store: Optional[BankStore] = None,
+                   timestamp: Optional[float] = None, use_numpy: Optional[bool] = None,
+                   chunk: int = CHUNK_ACCOUNTS) -> EodReport:
+    """Applique les règles de fin de journée à tous les comptes ; renvoie le rapport et ses mesures.
+
+    `store` : BankStore des comptes ; un seul fsync pour tout le traitement (chaque compte est
+    journalisé à part, sous son verrou). `chunk` : comptes par paquet pour les mesures de latence.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    report = EodReport("numpy" if use_numpy else "array")
+    timestamp = time.time() if timestamp is None else timestamp
+
+    # 1. Copie des soldes et plafonds dans des tableaux contigus (sans verrou : revérifiés à l'application)
+    began = time.perf_counter()
+    accounts = list(accounts)
+    report.accounts = len(accounts)
+    if use_numpy:
+        balances = np.fromiter(map(attrgetter("balance"), accounts), dtype=float, count=len(accounts))
+        limits = np.fromiter(map(attrgetter("limit"), accounts), dtype=float, count=len(accounts))
+    else:
+        balances = array("d", map(attrgetter("balance"), accounts))
+        limits = array("d", map(attrgetter("limit"), accounts))
+    report.timings["copie"] = time.perf_counter() - began
+
+    # 2. Règles appliquées à tous les comptes en un passage
+    began = time.perf_counter()
+    interest, fees, new_limits, changed = compute(balances, limits, rules, use_numpy)
+    if use_numpy:
+        # Valeurs Python pour la boucle d'application (plus rapide que d'indexer des scalaires NumPy)
+        balances, limits, interest, fees, new_limits = (
+            column.tolist() for column in (balances, limits, interest, fees, new_limits))
+        changed = changed.tolist()
+    report.timings["calcul"] = time.perf_counter() - began
+
+    # 3. Historique et journal, paquet par paquet, pour les seuls comptes modifiés ;
+    # group_commit ne sert qu'à regrouper les fsync
+    began = time.perf_counter()
+    touched: List[Account] = []
+    with store.group_commit(sync=False) if store is not None else nullcontext():
+        for start in range(0, len(changed), chunk):
+            chunk_began = time.perf_counter()
+            _apply_chunk(accounts, changed[start:start + chunk], balances, limits, interest, fees,
+                         new_limits, rules, timestamp, report, touched, use_numpy)
+            report.chunk_latencies.append(time.perf_counter() - chunk_began)
+    report.timings["historique"] = time.perf_counter() - began
+
+    # 4. Index des soldes : une reconstruction par registre plutôt qu'une mise à jour par compte
+    began = time.perf_counter()
+    registries: Dict[int, Tuple[object, List[Account]]] = {}
+    for account in touched:
+        if account.registry is not None:
+            registries.setdefault(id(account.registry), (account.registry, []))[1].append(account)
+    for registry, members in registries.values():
+        registry.balances_changed(members)
+    report.timings["index"] = time.perf_counter() - began
+
+    if store is not None:
+        began = time.perf_counter()
+        store.commit()
+        report.timings["fsync"] = time.perf_counter() - began
+    return report
+
+
+def _apply_chunk(accounts: List[Account], indices: Sequence[int], balances: Sequence[float],
+                 limits: Sequence[float], interest: Sequence[float], fees: Sequence[float],
+                 new_limits: Sequence[float], rules: EodRules, timestamp: float, report: EodReport,
+                 touched: List[Account], use_numpy: bool) -> None:
+    for k in indices:
+        account = accounts[k]
+        with account._lock:
+            if account.balance != balances[k] or account.limit != limits[k]:
+                # Opération arrivée depuis la copie : règles recalculées sur l'état actuel du compte
+                i, f, new_limit, _ = compute([account.balance], [account.limit], rules, use_numpy)
+                gained, fee, new_limit = float(i[0]), float(f[0]), float(new_limit[0])
+                report.recomputed += 1
+            else:
+                gained, fee, new_limit = interest[k], fees[k], new_limits[k]
+            codes: List[int] = []
+            amounts: List[float] = []
+            after: List[float] = []
+            balance = account.balance
+            if gained:
+                balance += gained
+                codes.append(INTEREST_CODE)
+                amounts.append(gained)
+                after.append(balance)
+            if fee:
+                balance -= fee
+                codes.append(FEE_CODE)
+                amounts.append(fee)
+                after.append(balance)
+            if new_limit != account.limit:
+                codes.append(LIMIT_CODE)
+                amounts.append(new_limit)
+                after.append(balance)
+                report.limits_changed += 1
+            if not codes:
+                continue
+            # Ligne de journal écrite avant de relâcher le verrou : une opération suivante sur ce
+            # compte aura forcément un lsn plus grand (ordre du rejeu = ordre réel)
+            with account._operation():
+                account.liste_historique.extend(codes, amounts, after, timestamp)
+                account.balance = balance
+                account.limit = new_limit
+                journal = account.journal
+                if journal is not None:
+                    stamp = account.liste_historique.timestamps[-1]     # éventuellement recalé par extend
+                    for code, amount, solde_apres in zip(codes, amounts, after):
+                        journal.record_history(account, OP_TYPES[code], amount, stamp, solde_apres)
+        touched.append(account)
+        report.changed += 1
+        report.rows += len(codes)
+        report.interest += gained
+        report.fees += fee
+
+
+# =======================
+#   Point d'entrée
+# =======================
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Traitement de fin de journée sur tous les comptes.")
+    parser.add_argument("--rate", type=float, default=0.0, help="taux d'intérêt annuel (0.02 = 2 %%)")
+    parser.add_argument("--fee", type=float, default=0.0, help="frais de tenue de compte")
+    parser.add_argument("--fee-below", type=float, default=0.0, help="solde en dessous duquel les frais s'appliquent")
+    parser.add_argument("--limit-min", type=float, help="plafond de retrait minimum")
+    parser.add_argument("--limit-max", type=float, help="plafond de retrait maximum")
+    parser.add_argument("--no-numpy", action="store_true", help="forcer le repli sur le module array")
+    parser.add_argument("--data", default=DATA_DIR, help="dossier du journal et des instantanés")
+    args = parser.parse_args(argv)
+
+    rules = EodRules(args.rate, args.fee, args.fee_below, args.limit_min, args.limit_max)
+    with BankStore(args.data) as store:
+        report = run_end_of_day(store.accounts.values(), rules, store, use_numpy=False if args.no_numpy else None)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
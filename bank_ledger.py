@@ -0,0 +1,159 @@
+"""
+Historique compact des opérations d'un compte
+---------------------------------------------------------
+- Stockage en tableaux typés parallèles (module array) : code d'opération, montant,
+  horodatage (secondes epoch) et solde après opération, soit ~25 octets par opération
+  au lieu d'un dictionnaire complet avec une date déjà mise en forme
+- La date lisible n'est calculée qu'à l'affichage (LedgerEntry.date)
+- Les tranches (ledger[a:b]) sont des vues : aucune copie de l'historique
+- Index temporel : horodatages croissants et solde après chaque opération, donc chaque
+  ligne sert de point de reprise ; « solde au temps T » et « opérations entre T1 et T2 »
+  se résolvent par recherche dichotomique, sans parcourir l'historique
+
+"""
+
+# --- Imports ---
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterator, Optional, Sequence, Union
+
+# --- Constantes ---
+DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+# Types d'opération connus ; le code stocké est l'indice dans ce tuple
+# (nouveaux types ajoutés en fin de tuple : les codes des instantanés existants restent valables)
+OP_TYPES = ("retrait", "depot", "transfert_sortant", "transfert_entrant", "modif_plafond", "interets", "frais")
+OP_CODES = {name: code for code, name in enumerate(OP_TYPES)}
+# Effet de chaque type sur le solde (+1 crédit, -1 débit, 0 sans effet) ; les lignes transfert_*
+# accompagnent le retrait / dépôt qui a déjà modifié le solde
+OP_SIGNS = (-1, 1, 0, 0, 0, 1, -1)
+
+# =======================
+#   Ligne d'historique
+# =======================
+
+class LedgerEntry:
+    """Une opération, créée à la demande à partir des tableaux du Ledger."""
+
+    __slots__ = ("type", "montant", "timestamp", "solde_apres")
+
+    def __init__(self, type_op: str, montant: float, timestamp: float, solde_apres: float) -> None:
+        self.type = type_op
+        self.montant = montant
+        self.timestamp = timestamp
+        self.solde_apres = solde_apres
+
+    @property
+    def date(self) -> str:
+        """Date lisible, mise en forme seulement quand on l'affiche."""
+        return datetime.fromtimestamp(self.timestamp).strftime(DATE_FORMAT)
+
+    def __getitem__(self, key: str):
+        """Accès façon dictionnaire (op["montant"]), comme l'ancien historique."""
+        if key not in ("type", "montant", "date", "solde_apres", "timestamp"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def as_dict(self) -> dict:
+        return {"type": self.type, "montant": self.montant, "date": self.date, "solde_apres": self.solde_apres}
+
+    def __repr__(self) -> str:
+        return f"LedgerEntry({self.type!r}, {self.montant!r}, {self.date!r}, {self.solde_apres!r})"
+
+# =======================
+#   Historique
+# =======================
+
+class Ledger:
+    """Historique en tableaux parallèles ; se parcourt et se découpe comme une liste."""
+
+    __slots__ = ("codes", "amounts", "timestamps", "balances")
+
+    def __init__(self) -> None:
+        self.codes = array("B")        # code d'opération (indice dans OP_TYPES)
+        self.amounts = array("d")      # montant
+        self.timestamps = array("d")   # secondes depuis epoch
+        self.balances = array("d")     # solde après opération
+
+    def append(self, type_op: str, montant: float, solde_apres: float, timestamp: Optional[float] = None) -> None:
+        if timestamp is None:
+            timestamp = time.time()
+        # Horodatages jamais décroissants (horloge recalée en arrière) : la recherche par date reste valable
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            timestamp = self.timestamps[-1]
+        self.codes.append(OP_CODES[type_op])
+        self.amounts.append(montant)
+        self.timestamps.append(timestamp)
+        self.balances.append(solde_apres)
+
+    def extend(self, codes: Sequence[int], amounts: Sequence[float], balances: Sequence[float],
+               timestamp: float) -> None:
+        """Ajoute plusieurs lignes d'un coup, toutes au même horodatage (traitements de fin de journée)."""
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            timestamp = self.timestamps[-1]
+        self.codes.extend(codes)
+        self.amounts.extend(amounts)
+        self.timestamps.extend([timestamp] * len(codes))
+        self.balances.extend(balances)
+
+    def entry(self, i: int) -> LedgerEntry:
+        return LedgerEntry(OP_TYPES[self.codes[i]], self.amounts[i], self.timestamps[i], self.balances[i])
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[LedgerEntry, "LedgerView"]:
+        if isinstance(key, slice):
+            return LedgerView(self, range(len(self))[key])
+        return self.entry(range(len(self))[key])
+
+    def __iter__(self) -> Iterator[LedgerEntry]:
+        for i in range(len(self)):
+            yield self.entry(i)
+
+    # --- Index temporel ---
+    def index_at(self, timestamp: float) -> int:
+        """Nombre d'opérations faites jusqu'à `timestamp` inclus (recherche dichotomique)."""
+        return bisect_right(self.timestamps, timestamp)
+
+    def balance_before(self, i: int) -> float:
+        """Solde juste avant l'opération i (solde après, moins son effet)."""
+        return self.balances[i] - OP_SIGNS[self.codes[i]] * self.amounts[i]
+
+    def balance_at(self, timestamp: float, current: float) -> float:
+        """Solde au temps `timestamp` ; `current` (solde actuel) sert quand l'historique est vide."""
+        i = self.index_at(timestamp)
+        if i:
+            return self.balances[i - 1]
+        return self.balance_before(0) if len(self) else current
+
+    def between(self, start: float, end: float) -> "LedgerView":
+        """Opérations telles que start < horodatage <= end (vue, sans copie)."""
+        return LedgerView(self, range(self.index_at(start), self.index_at(end)))
+
+    def nbytes(self) -> int:
+        """Place occupée par les données (hors en-têtes des objets Python)."""
+        return sum(a.itemsize * len(a) for a in (self.codes, self.amounts, self.timestamps, self.balances))
+
+
+class LedgerView:
+    """Tranche d'un Ledger : ne garde que la plage d'indices, les lignes sont lues à la demande."""
+
+    __slots__ = ("ledger", "indices")
+
+    def __init__(self, ledger: Ledger, indices: range) -> None:
+        self.ledger = ledger
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[LedgerEntry, "LedgerView"]:
+        if isinstance(key, slice):
+            return LedgerView(self.ledger, self.indices[key])
+        return self.ledger.entry(self.indices[key])
+
+    def __iter__(self) -> Iterator[LedgerEntry]:
+        for i in self.indices:
+            yield self.ledger.entry(i)
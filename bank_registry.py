@@ -0,0 +1,343 @@
+"""
+Registre des comptes indexé
+---------------------------------------------------------
+- Index principal : numéro de compte -> Account
+- Numéros uniques attribués sans tirage au sort ni nouvel essai : le n-ième compte reçoit
+  l'image de n par une permutation affine de [1 000 000 000, 9 999 999 999]
+  (numéros d'apparence aléatoire, jamais deux fois le même) ; les numéros tirés au hasard
+  avant le registre sont mis de côté et sautés, sans avancer le compteur jusqu'à eux
+- Index secondaires triés, mis à jour au fil des opérations :
+  titulaire (recherche par préfixe, sans tenir compte de la casse) et solde (comptes
+  rangés par solde, entre deux bornes)
+- Mise à jour groupée des soldes (fin de journée) : index reconstruit en un seul tri
+- Listes triées découpées en blocs : insertion, suppression et recherche en
+  O(log n + taille d'un bloc), même avec un million de comptes ; accès par rang
+  (n-ième titulaire par ordre alphabétique) pour les listes virtuelles de l'interface
+
+"""
+
+# --- Imports ---
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from bank_engine import Account
+
+# --- Constantes ---
+NUMBER_MIN: int = 1_000_000_000              # plus petit numéro à 10 chiffres
+NUMBER_SPAN: int = 9_000_000_000             # nombre de numéros à 10 chiffres
+NUMBER_MULTIPLIER: int = 7_046_029_253       # premier avec NUMBER_SPAN (ni 2, ni 3, ni 5) : bijection
+NUMBER_OFFSET: int = 2_718_281_828
+NUMBER_INVERSE: int = pow(NUMBER_MULTIPLIER, -1, NUMBER_SPAN)
+BLOCK_SIZE: int = 512                        # taille visée des blocs des index triés
+
+
+def number_for(sequence: int) -> int:
+    """Numéro de compte du `sequence`-ième compte créé (bijection sur les numéros à 10 chiffres)."""
+    if not 0 <= sequence < NUMBER_SPAN:
+        raise OverflowError("plus aucun numéro de compte disponible")
+    return NUMBER_MIN + (sequence * NUMBER_MULTIPLIER + NUMBER_OFFSET) % NUMBER_SPAN
+
+
+def sequence_of(number: int) -> int:
+    """Inverse de number_for (pour les numéros créés avant le registre : un rang quelconque)."""
+    return ((number - NUMBER_MIN - NUMBER_OFFSET) * NUMBER_INVERSE) % NUMBER_SPAN
+
+# =======================
+#   Index trié
+# =======================
+
+class SortedIndex:
+    """Liste triée de tuples, découpée en blocs (chaque bloc trié, `maxes` = dernier élément de chaque bloc)."""
+
+    __slots__ = ("_blocks", "_maxes", "_len", "_offsets")
+
+    def __init__(self, items: Iterable[tuple] = ()) -> None:
+        items = sorted(items)
+        self._blocks: List[List[tuple]] = [items[i:i + BLOCK_SIZE] for i in range(0, len(items), BLOCK_SIZE)]
+        self._maxes: List[tuple] = [block[-1] for block in self._blocks]
+        self._len = len(items)
+        # Rang du premier élément de chaque bloc, recalculé à la demande après une modification
+        self._offsets: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _block_offsets(self) -> List[int]:
+        if self._offsets is None:
+            offsets, total = [], 0
+            for block in self._blocks:
+                offsets.append(total)
+                total += len(block)
+            self._offsets = offsets
+        return self._offsets
+
+    def __getitem__(self, position: int) -> tuple:
+        """Élément de rang `position` (0 = le plus petit)."""
+        if not 0 <= position < self._len:
+            raise IndexError(position)
+        offsets = self._block_offsets()
+        i = bisect_right(offsets, position) - 1
+        return self._blocks[i][position - offsets[i]]
+
+    def position(self, item: tuple) -> int:
+        """Rang auquel `item` serait inséré (nombre d'éléments strictement plus petits)."""
+        i = bisect_left(self._maxes, item)
+        if i == len(self._blocks):
+            return self._len
+        return self._block_offsets()[i] + bisect_left(self._blocks[i], item)
+
+    def add(self, item: tuple) -> None:
+        self._offsets = None
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item)
+            self._len = 1
+            return
+        i = min(bisect_left(self._maxes, item), len(self._maxes) - 1)
+        block = self._blocks[i]
+        insort(block, item)
+        self._maxes[i] = block[-1]
+        self._len += 1
+        if len(block) > 2 * BLOCK_SIZE:
+            # Bloc trop grand : coupé en deux
+            self._blocks[i:i + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            self._maxes[i:i + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+
+    def remove(self, item: tuple) -> None:
+        i = bisect_left(self._maxes, item)
+        block = self._blocks[i] if i < len(self._blocks) else ()
+        j = bisect_left(block, item)
+        if j == len(block) or block[j] != item:
+            raise KeyError(item)
+        self._offsets = None
+        del block[j]
+        self._len -= 1
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+
+    def irange(self, start: Optional[tuple] = None, stop: Optional[tuple] = None,
+               reverse: bool = False) -> Iterator[tuple]:
+        """Éléments x tels que start <= x <= stop (bornes None = sans limite), en ordre croissant ou décroissant."""
+        if not reverse:
+            i = 0 if start is None else bisect_left(self._maxes, start)
+            j = 0 if start is None or i == len(self._blocks) else bisect_left(self._blocks[i], start)
+            for block in self._blocks[i:i + 1]:
+                for item in block[j:]:
+                    if stop is not None and item > stop:
+                        return
+                    yield item
+            for k in range(i + 1, len(self._blocks)):
+                for item in self._blocks[k]:
+                    if stop is not None and item > stop:
+                        return
+                    yield item
+        else:
+            i = len(self._blocks) - 1 if stop is None else min(bisect_right(self._maxes, stop), len(self._blocks) - 1)
+            for k in range(i, -1, -1):
+                block = self._blocks[k]
+                end = len(block) if stop is None or k != i else bisect_right(block, stop)
+                for item in reversed(block[:end]):
+                    if start is not None and item < start:
+                        return
+                    yield item
+
+# =======================
+#   Registre
+# =======================
+
+class AccountRegistry:
+    """Comptes indexés par numéro (principal), titulaire et solde (secondaires).
+
+    Se comporte comme un dict numéro -> Account ; get() accepte aussi un titulaire (s'il
+    est unique) ou un numéro écrit en chiffres, comme dans les lots d'opérations.
+    """
+
+    def __init__(self, accounts: Iterable[Account] = (), next_sequence: int = 0,
+                 legacy_numbers: Iterable[int] = ()) -> None:
+        self._lock = threading.RLock()
+        self._by_number: Dict[int, Account] = {}
+        for account in accounts:
+            if account.account_number in self._by_number:
+                raise ValueError(f"numéro de compte en double : {account.account_number}")
+            self._by_number[account.account_number] = account
+            account.registry = self
+        self.next_sequence = next_sequence   # rang du prochain compte créé (voir number_for)
+        # Numéros pris hors de la suite (comptes antérieurs au registre, tirés au hasard) : l'attribution
+        # les saute le moment venu, sans avancer le compteur jusqu'à eux
+        self.legacy_numbers = {n for n in legacy_numbers if sequence_of(n) >= next_sequence}
+        self.legacy_numbers.update(n for n in self._by_number if sequence_of(n) >= next_sequence)
+        # Index secondaires construits en un seul tri
+        self._balances: Dict[int, float] = {n: a.balance for n, a in self._by_number.items()}
+        self._by_holder = SortedIndex((a.holder_name.casefold(), n) for n, a in self._by_number.items())
+        self._by_balance = SortedIndex((b, n) for n, b in self._balances.items())
+
+    # --- Numéros ---
+    def allocate_number(self) -> int:
+        """Réserve le prochain numéro de compte : toujours libre, sans nouvel essai."""
+        with self._lock:
+            while True:
+                number = number_for(self.next_sequence)
+                self.next_sequence += 1
+                if number not in self.legacy_numbers:
+                    return number
+                self.legacy_numbers.discard(number)  # désormais derrière le compteur
+
+    # --- Index principal (comme un dict) ---
+    def __getitem__(self, number: int) -> Account:
+        return self._by_number[number]
+
+    def __contains__(self, number: object) -> bool:
+        return number in self._by_number
+
+    def __len__(self) -> int:
+        return len(self._by_number)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._by_number))
+
+    def values(self) -> List[Account]:
+        with self._lock:
+            return list(self._by_number.values())
+
+    def get(self, key: Union[int, str, None], default: Optional[Account] = None) -> Optional[Account]:
+        """Compte par numéro (entier ou chiffres) ou par titulaire s'il n'y en a qu'un de ce nom."""
+        if isinstance(key, str) and key.strip().isascii() and key.strip().isdecimal():
+            key = int(key)                   # chiffres ASCII seulement ("²".isdigit() est vrai)
+        if isinstance(key, int):
+            return self._by_number.get(key, default)
+        if isinstance(key, str):
+            matches = self.find_holder(key, limit=2)
+            return matches[0] if len(matches) == 1 else default
+        return default
+
+    def add(self, account: Account) -> None:
+        with self._lock:
+            number = account.account_number
+            if number in self._by_number:
+                raise ValueError(f"numéro de compte déjà utilisé : {number}")
+            self._by_number[number] = account
+            sequence = sequence_of(number)
+            if sequence == self.next_sequence and number not in self.legacy_numbers:
+                self.next_sequence += 1      # numéro suivant de la suite (ex. rejeu du journal)
+            elif sequence > self.next_sequence:
+                self.legacy_numbers.add(number)
+            self._balances[number] = account.balance
+            self._by_holder.add((account.holder_name.casefold(), number))
+            self._by_balance.add((account.balance, number))
+            account.registry = self
+
+    def remove(self, account: Account) -> None:
+        with self._lock:
+            number = account.account_number
+            del self._by_number[number]
+            self._by_holder.remove((account.holder_name.casefold(), number))
+            self._by_balance.remove((self._balances.pop(number), number))
+            account.registry = None
+
+    def pop(self, number: int) -> Account:
+        account = self._by_number[number]
+        self.remove(account)
+        return account
+
+    # --- Index secondaires ---
+    def balance_changed(self, account: Account) -> None:
+        """Appelé par Account après chaque opération : replace le compte dans l'index des soldes."""
+        with self._lock:
+            number = account.account_number
+            old = self._balances.get(number)
+            if old is None or old == account.balance:
+                return
+            self._by_balance.remove((old, number))
+            self._by_balance.add((account.balance, number))
+            self._balances[number] = account.balance
+
+    def balances_changed(self, accounts: Iterable[Account]) -> None:
+        """Comme balance_changed pour beaucoup de comptes (traitement de fin de journée).
+
+        Au-delà d'un compte sur huit, l'index des soldes est reconstruit en un seul tri plutôt
+        que mis à jour compte par compte. Le tri se fait hors du verrou : les opérations
+        continuent pendant ce temps, leurs changements de solde sont rattrapés à l'échange.
+        """
+        accounts = list(accounts)
+        with self._lock:
+            if len(accounts) * 8 < len(self._by_number):
+                for account in accounts:
+                    self.balance_changed(account)
+                return
+            balances = {n: a.balance for n, a in self._by_number.items()}
+        index = SortedIndex(zip(balances.values(), balances.keys()))
+        with self._lock:
+            current: Dict[int, float] = {}
+            for number, account in self._by_number.items():
+                balance = current[number] = account.balance
+                old = balances.pop(number, None)
+                if old is None:                      # compte ajouté pendant le tri
+                    index.add((balance, number))
+                elif old != balance:
+                    index.remove((old, number))
+                    index.add((balance, number))
+            for number, old in balances.items():     # comptes supprimés pendant le tri
+                index.remove((old, number))
+            self._balances, self._by_balance = current, index
+
+    def find_holder(self, name: str, limit: Optional[int] = None) -> List[Account]:
+        """Comptes dont le titulaire s'appelle exactement `name`."""
+        key = name.casefold()
+        found: List[Account] = []
+        with self._lock:
+            for _, number in self._by_holder.irange((key,), (key, float("inf"))):
+                if limit is not None and len(found) >= limit:
+                    break
+                account = self._by_number[number]
+                if account.holder_name == name:
+                    found.append(account)
+        return found
+
+    def search_holder(self, prefix: str, limit: Optional[int] = 50) -> List[Account]:
+        """Comptes dont le titulaire commence par `prefix` (sans tenir compte de la casse), par ordre alphabétique."""
+        key = prefix.casefold()
+        found: List[Account] = []
+        with self._lock:
+            for holder, number in self._by_holder.irange((key,)):
+                if not holder.startswith(key) or (limit is not None and len(found) >= limit):
+                    break
+                found.append(self._by_number[number])
+        return found
+
+    def holder_range(self, prefix: str = "") -> Tuple[int, int]:
+        """Rangs [début, fin) des titulaires commençant par `prefix` dans l'ordre alphabétique."""
+        key = prefix.casefold()
+        with self._lock:
+            start = self._by_holder.position((key,))
+            if not key:
+                return start, len(self._by_holder)
+            # Première clé qui ne commence plus par `key` : on incrémente son dernier caractère
+            end = self._by_holder.position((key[:-1] + chr(ord(key[-1]) + 1),))
+            return start, end
+
+    def holder_at(self, position: int) -> Account:
+        """Compte de rang `position` dans l'ordre alphabétique des titulaires."""
+        with self._lock:
+            return self._by_number[self._by_holder[position][1]]
+
+    def holder_position(self, account: Account) -> int:
+        """Rang du compte dans l'ordre alphabétique des titulaires."""
+        with self._lock:
+            return self._by_holder.position((account.holder_name.casefold(), account.account_number))
+
+    def by_balance(self, minimum: Optional[float] = None, maximum: Optional[float] = None,
+                   limit: Optional[int] = 50, descending: bool = False) -> List[Account]:
+        """Comptes dont le solde est entre `minimum` et `maximum` (inclus), rangés par solde."""
+        start: Optional[Tuple[float]] = None if minimum is None else (float(minimum),)
+        stop: Optional[Tuple[float, float]] = None if maximum is None else (float(maximum), float("inf"))
+        found: List[Account] = []
+        with self._lock:
+            for _, number in self._by_balance.irange(start, stop, reverse=descending):
+                if limit is not None and len(found) >= limit:
+                    break
+                found.append(self._by_number[number])
+        return found
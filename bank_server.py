@@ -0,0 +1,277 @@
+"""
+Serveur de transactions (asyncio) devant le modèle Account
+---------------------------------------------------------
+Protocole : une requête JSON par ligne, une réponse JSON par ligne, dans le même ordre.
+- {"id": 1, "op": "deposit" | "withdraw" | "set_limit", "account": "Ross", "amount": 100}
+- {"id": 2, "op": "transfer", "account": "Ross", "target": "Rachel", "amount": 50}
+- {"id": 3, "op": "balance", "account": "Ross"}
+- {"id": 4, "op": "history", "account": "Ross", "limit": 20}     (dernières opérations)
+Réponse : {"id": ..., "ok": true|false, "code": ..., "message": ..., "balance": ...}
+(+ "history" pour l'opération history). Les comptes sont désignés par leur numéro ou par
+leur titulaire s'il est unique (bank_registry.AccountRegistry.get), comme dans les lots.
+
+- Pipelining : un client peut envoyer plusieurs requêtes sans attendre les réponses
+- Validation groupée : les requêtes en attente (toutes connexions confondues) sont
+  appliquées par paquets, puis un seul fsync du journal (bank_storage) couvre tout le
+  paquet ; les réponses ne partent qu'après ce fsync
+- Client de charge intégré : mesure ops/s et latences (p50, p99)
+
+Exemple :
+    python bank_server.py serve --accounts 100
+    python bank_server.py load --connections 8 --pipeline 32 --ops 100000
+"""
+
+# --- Imports ---
+import argparse
+import asyncio
+import json
+import random
+import time
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from bank_engine import Account, OperationResult, INVALID_ROW, UNKNOWN_ACCOUNT, apply_operation
+from bank_registry import AccountRegistry
+from bank_storage import BankStore, DATA_DIR
+
+# --- Constantes par défaut ---
+HOST: str = "127.0.0.1"
+PORT: int = 8765
+MAX_BATCH: int = 4096                        # requêtes appliquées au plus par fsync
+QUEUE_SIZE: int = 65536                      # requêtes en attente avant de ne plus lire les sockets
+HISTORY_LIMIT: int = 20                      # lignes d'historique renvoyées par défaut
+READ_OPERATIONS: Tuple[str, ...] = ("balance", "history")
+JOURNAL_ERROR: str = "journal_indisponible"  # fsync du paquet impossible : rien n'est garanti durable
+
+# =======================
+#   Serveur
+# =======================
+
+class BankServer:
+    def __init__(self, store: BankStore, max_batch: int = MAX_BATCH) -> None:
+        self.store = store
+        self.max_batch = max_batch
+        # Registre des comptes (numéro, ou titulaire s'il est unique)
+        self.accounts: AccountRegistry = store.accounts
+        # (connexion, ligne de requête) ; ligne None = fermer la connexion après les réponses précédentes
+        self.queue: "asyncio.Queue[Tuple[asyncio.StreamWriter, Optional[bytes]]]" = asyncio.Queue(QUEUE_SIZE)
+        self.applied = 0
+        self.batches = 0
+
+    # --- Requêtes ---
+    def handle(self, line: bytes) -> bytes:
+        """Applique une requête (ligne JSON) et renvoie la ligne de réponse."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            return self._reply(None, OperationResult(INVALID_ROW, "Requête JSON invalide."))
+        op = request.get("op")
+        if op not in READ_OPERATIONS:
+            # Opérations de modification : mêmes règles et mêmes codes que les lots
+            result = apply_operation(self.accounts, request)
+            account = self.accounts.get(request.get("account")) if result else None
+            return self._reply(request.get("id"), result, account)
+        account = self.accounts.get(request.get("account"))
+        if account is None:
+            return self._reply(request.get("id"),
+                               OperationResult(UNKNOWN_ACCOUNT, f"Compte inconnu : {request.get('account')!r}."))
+        if op == "balance":
+            return self._reply(request.get("id"), OperationResult(), account)
+        try:
+            limit = max(0, int(request.get("limit", HISTORY_LIMIT)))
+        except (TypeError, ValueError):
+            return self._reply(request.get("id"),
+                               OperationResult(INVALID_ROW, f"Limite invalide : {request.get('limit')!r}."))
+        ledger = account.liste_historique
+        entries = ledger[max(0, len(ledger) - limit):]
+        return self._reply(request.get("id"), OperationResult(), account, [entry.as_dict() for entry in entries])
+
+    def respond(self, line: bytes) -> bytes:
+        """handle() protégé : une requête qui lève une exception reçoit une réponse INVALID_ROW,
+        sans arrêter la boucle qui applique les requêtes de tous les clients."""
+        try:
+            return self.handle(line)
+        except Exception as exc:
+            return self._reply(self._request_id(line), OperationResult(INVALID_ROW, f"Requête invalide : {exc}."))
+
+    @staticmethod
+    def _request_id(line: bytes):
+        """Identifiant de la requête, ou None si la ligne n'est pas un objet JSON."""
+        try:
+            return json.loads(line).get("id")
+        except Exception:
+            return None
+
+    @staticmethod
+    def _reply(request_id, result: OperationResult, account: Optional[Account] = None,
+               history: Optional[List[dict]] = None) -> bytes:
+        response = {"id": request_id, "ok": result.ok, "code": result.code, "message": result.message}
+        if account is not None:
+            response["balance"] = account.balance
+            response["limit"] = account.limit
+        if history is not None:
+            response["history"] = history
+        return json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    # --- Boucles ---
+    async def apply_batches(self) -> None:
+        """Applique les requêtes en attente par paquets : un fsync par paquet, puis les réponses."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            with self.store.group_commit(sync=False):
+                responses = [(writer, line and self.respond(line)) for writer, line in batch]
+            # fsync dans un thread : la boucle continue de lire les requêtes suivantes
+            try:
+                await loop.run_in_executor(None, self.store.commit)
+            except Exception as exc:
+                # Journal non durable (disque plein, erreur d'E/S...) : tout le paquet reçoit une erreur
+                # au lieu des réponses prévues, et la boucle continue (le commit suivant réessaie le fsync)
+                failure = OperationResult(JOURNAL_ERROR, f"Écriture du journal impossible : {exc}.")
+                responses = [(writer, response and self._reply(self._request_id(line), failure))
+                             for (writer, response), (_, line) in zip(responses, batch)]
+            for writer, response in responses:
+                if writer.is_closing():
+                    continue
+                if response is None:
+                    writer.close()
+                else:
+                    writer.write(response)
+            self.applied += len(batch)
+            self.batches += 1
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await self.queue.put((writer, line))
+                # Client qui ne lit pas ses réponses : on arrête de lire ses requêtes
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        # Fermeture une fois envoyées les réponses aux requêtes déjà lues
+        await self.queue.put((writer, None))
+
+    async def serve(self, host: str = HOST, port: int = PORT, unix_path: Optional[str] = None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        applier = asyncio.create_task(self.apply_batches())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            applier.cancel()
+
+# =======================
+#   Client de charge
+# =======================
+
+async def _load_connection(open_connection, names: List[str], operations: int, pipeline: int,
+                           rng: random.Random, latencies: List[float], codes: Dict[str, int]) -> None:
+    """Une connexion : garde jusqu'à `pipeline` requêtes en vol et mesure la latence de chacune."""
+    reader, writer = await open_connection()
+    in_flight = asyncio.Semaphore(pipeline)
+    sent: List[float] = []                   # heures d'envoi, dans l'ordre (les réponses arrivent dans l'ordre)
+
+    async def send() -> None:
+        for i in range(operations):
+            await in_flight.acquire()
+            op = rng.choice(("deposit", "withdraw", "transfer", "balance"))
+            request = {"id": i, "op": op, "account": rng.choice(names), "amount": rng.randint(1, 300)}
+            if op == "transfer":
+                request["target"] = rng.choice(names)
+            sent.append(time.perf_counter())
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def receive() -> None:
+        for i in range(operations):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("connexion fermée par le serveur")
+            latencies.append(time.perf_counter() - sent[i])
+            code = json.loads(line)["code"]
+            codes[code] = codes.get(code, 0) + 1
+            in_flight.release()
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+
+
+async def run_load(host: str = HOST, port: int = PORT, unix_path: Optional[str] = None, connections: int = 8,
+                   pipeline: int = 32, operations: int = 100_000, accounts: int = 100, seed: int = 0) -> dict:
+    """Envoie `operations` requêtes réparties sur `connections` connexions ; renvoie débit et latences."""
+    if unix_path:
+        open_connection = partial(asyncio.open_unix_connection, unix_path)
+    else:
+        open_connection = partial(asyncio.open_connection, host, port)
+    names = [f"Client {i}" for i in range(accounts)]
+    latencies: List[float] = []
+    codes: Dict[str, int] = {}
+    per_connection = operations // connections
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _load_connection(open_connection, names, per_connection, pipeline, random.Random(seed * 1000 + i),
+                         latencies, codes)
+        for i in range(connections)
+    ))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "operations": len(latencies), "connections": connections, "pipeline": pipeline, "wall_s": wall,
+        "ops_per_s": len(latencies) / wall,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "codes": codes,
+    }
+
+# =======================
+#   Point d'entrée
+# =======================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serveur de transactions bancaires (JSON par ligne).")
+    parser.add_argument("mode", choices=("serve", "load"), help="serve : lance le serveur ; load : client de charge")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="socket Unix à utiliser à la place de TCP")
+    parser.add_argument("--data", default=DATA_DIR, help="serve : dossier du journal et des instantanés")
+    parser.add_argument("--accounts", type=int, default=100,
+                        help="comptes « Client 0 » ... créés au besoin (serve) ou utilisés (load) (défaut : 100)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="serve : requêtes au plus par fsync")
+    parser.add_argument("--connections", type=int, default=8, help="load : connexions simultanées (défaut : 8)")
+    parser.add_argument("--pipeline", type=int, default=32, help="load : requêtes en vol par connexion (défaut : 32)")
+    parser.add_argument("--ops", type=int, default=100_000, help="load : nombre total de requêtes (défaut : 100000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.mode == "load":
+        result = asyncio.run(run_load(args.host, args.port, args.unix, args.connections, args.pipeline,
+                                      args.ops, args.accounts, args.seed))
+        print(json.dumps(result))
+        return
+    with BankStore(args.data) as store:
+        names = {acc.holder_name for acc in store.accounts.values()}
+        with store.group_commit():
+            for i in range(args.accounts):
+                if f"Client {i}" not in names:
+                    store.create_account(f"Client {i}")
+        server = BankServer(store, args.max_batch)
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
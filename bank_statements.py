@@ -0,0 +1,152 @@
+"""
+Soldes à une date et relevés de compte
+---------------------------------------------------------
+- balance_at(account, T) : solde au temps T (recherche dichotomique dans l'historique)
+- statement(account, T1, T2) : relevé de la période ]T1, T2] : solde d'ouverture, opérations,
+  total des crédits et des débits, solde de clôture
+- export_statements : relevés de tous les comptes en un seul passage, écrits au fil de l'eau
+  (CSV ou JSON Lines selon l'extension) ; un compte coûte O(log n + opérations de la période)
+- Relevés de fin de mois en ligne de commande
+
+Exemple :
+    python bank_statements.py --month 2026-09 --out releves-2026-09.csv
+"""
+
+# --- Imports ---
+import argparse
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Tuple
+
+from bank_engine import Account
+from bank_ledger import DATE_FORMAT, LedgerView, OP_SIGNS, OP_TYPES
+from bank_storage import BankStore, DATA_DIR
+
+# --- Constantes ---
+CSV_FIELDS = ("account", "holder", "line", "date", "type", "montant", "solde_apres")
+
+# =======================
+#   Relevé
+# =======================
+
+@dataclass
+class Statement:
+    account_number: int
+    holder_name: str
+    start: float                 # début de période (exclu), secondes epoch
+    end: float                   # fin de période (incluse)
+    opening: float               # solde au temps start
+    closing: float               # solde au temps end
+    credits: float
+    debits: float
+    operations: LedgerView       # opérations de la période (vue sur l'historique, sans copie)
+
+
+def balance_at(account: Account, timestamp: float) -> float:
+    """Solde du compte au temps `timestamp` (opérations faites jusqu'à cet instant inclus)."""
+    return account.liste_historique.balance_at(timestamp, account.balance)
+
+
+def statement(account: Account, start: float, end: float) -> Statement:
+    """Relevé de la période ]start, end] : deux recherches dichotomiques puis les seules lignes de la période."""
+    ledger = account.liste_historique
+    operations = ledger.between(start, end)
+    credits = debits = 0.0
+    codes, amounts = ledger.codes, ledger.amounts
+    for i in operations.indices:
+        sign = OP_SIGNS[codes[i]]
+        if sign > 0:
+            credits += amounts[i]
+        elif sign < 0:
+            debits += amounts[i]
+    return Statement(account.account_number, account.holder_name, start, end,
+                     ledger.balance_at(start, account.balance), ledger.balance_at(end, account.balance),
+                     credits, debits, operations)
+
+
+def iter_statements(accounts: Iterable[Account], start: float, end: float) -> Iterator[Statement]:
+    for account in accounts:
+        yield statement(account, start, end)
+
+# =======================
+#   Export
+# =======================
+
+def _format_date(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime(DATE_FORMAT)
+
+
+def export_statements(accounts: Iterable[Account], start: float, end: float, path: str) -> Tuple[int, int]:
+    """Écrit les relevés de tous les comptes (CSV ou JSON Lines) ; renvoie (comptes, opérations).
+
+    CSV : pour chaque compte une ligne « ouverture », une par opération, puis « cloture ».
+    JSON Lines : un objet par compte. Écrit dans <path>.part puis renommé.
+    """
+    part_path = path + ".part"
+    n_accounts = n_operations = 0
+    period = (_format_date(start), _format_date(end))
+    with open(part_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f) if path.endswith(".csv") else None
+        if writer:
+            writer.writerow(CSV_FIELDS)
+        for st in iter_statements(accounts, start, end):
+            ledger, indices = st.operations.ledger, st.operations.indices
+            codes, amounts, stamps, balances = ledger.codes, ledger.amounts, ledger.timestamps, ledger.balances
+            if writer:
+                writer.writerow((st.account_number, st.holder_name, "ouverture", period[0], "", "", f"{st.opening:.2f}"))
+                writer.writerows(
+                    (st.account_number, st.holder_name, "operation", _format_date(stamps[i]), OP_TYPES[codes[i]],
+                     f"{amounts[i]:.2f}", f"{balances[i]:.2f}")
+                    for i in indices
+                )
+                writer.writerow((st.account_number, st.holder_name, "cloture", period[1], "", "", f"{st.closing:.2f}"))
+            else:
+                f.write(json.dumps({
+                    "account": st.account_number, "holder": st.holder_name, "from": period[0], "to": period[1],
+                    "opening": st.opening, "closing": st.closing, "credits": st.credits, "debits": st.debits,
+                    "operations": [[_format_date(stamps[i]), OP_TYPES[codes[i]], amounts[i], balances[i]]
+                                   for i in indices],
+                }, ensure_ascii=False) + "\n")
+            n_accounts += 1
+            n_operations += len(indices)
+    os.replace(part_path, path)
+    return n_accounts, n_operations
+
+
+def month_bounds(month: str) -> Tuple[float, float]:
+    """'2026-09' -> (fin du mois précédent, fin du mois) en secondes epoch, heure locale."""
+    first = datetime.strptime(month, "%Y-%m")
+    following = first.replace(year=first.year + first.month // 12, month=first.month % 12 + 1)
+    return first.timestamp(), following.timestamp()
+
+# =======================
+#   Point d'entrée
+# =======================
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Relevés de compte sur une période.")
+    period = parser.add_mutually_exclusive_group(required=True)
+    period.add_argument("--month", help="mois du relevé, AAAA-MM")
+    period.add_argument("--between", nargs=2, metavar=("DEBUT", "FIN"),
+                        help=f"période ]DEBUT, FIN], au format \"{DATE_FORMAT}\"")
+    parser.add_argument("--out", required=True, help="fichier de sortie (.csv ou .jsonl)")
+    parser.add_argument("--data", default=DATA_DIR, help="dossier du journal et des instantanés")
+    args = parser.parse_args(argv)
+
+    if args.month:
+        start, end = month_bounds(args.month)
+    else:
+        start, end = (datetime.strptime(text, DATE_FORMAT).timestamp() for text in args.between)
+    with BankStore(args.data) as store:
+        began = time.perf_counter()
+        n_accounts, n_operations = export_statements(store.accounts.values(), start, end, args.out)
+    print(f"{n_accounts} relevé(s), {n_operations} opération(s) -> {args.out} "
+          f"({time.perf_counter() - began:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Persistance des comptes : journal d'écriture anticipée (WAL) + instantanés
+---------------------------------------------------------
+- Chaque modification d'un Account (création, suppression, ligne d'historique avec le
+  solde après opération) est ajoutée au journal bank.wal ; une opération complète
+  (ex. un transfert : retrait + dépôt des deux côtés) forme une seule ligne
+- Ligne du journal : "<crc32 hex> <json>\\n" ; une ligne incomplète ou corrompue en fin de
+  fichier (arrêt brutal pendant l'écriture) est ignorée puis tronquée au redémarrage
+- fsync groupé : un fsync toutes les `sync_every` opérations, ou un seul pour tout un
+  bloc `with store.group_commit():` ; une opération est acquise quand commit() a rendu la main
+- Instantané compact (snapshot.bin) toutes les `snapshot_every` opérations : en-tête JSON
+  puis l'historique de chaque compte en tableaux binaires ; le journal est alors vidé
+- Au démarrage : lecture du dernier instantané puis rejeu de la seule fin du journal
+- Utilisable depuis plusieurs threads : chaque thread regroupe ses propres opérations,
+  l'écriture dans le journal et les instantanés passent par un verrou du magasin
+
+"""
+
+# --- Imports ---
+import json
+import os
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from bank_engine import Account, DEFAULT_BALANCE, DEFAULT_LIMIT
+from bank_registry import AccountRegistry
+
+# --- Constantes par défaut ---
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bank_data")
+WAL_NAME: str = "bank.wal"
+SNAPSHOT_NAME: str = "snapshot.bin"
+SNAPSHOT_VERSION: int = 1
+SYNC_EVERY: int = 1                          # fsync après chaque opération (hors group_commit)
+SNAPSHOT_EVERY: int = 100_000                # opérations journalisées entre deux instantanés
+
+
+def _fsync_dir(directory: str) -> None:
+    """Rend durable un renommage dans le dossier (sans effet sur les systèmes qui ne le permettent pas)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# =======================
+#   Stockage
+# =======================
+
+class BankStore:
+    def __init__(self, directory: str = DATA_DIR, sync_every: int = SYNC_EVERY,
+                 snapshot_every: int = SNAPSHOT_EVERY) -> None:
+        self.directory = directory
+        self.sync_every = sync_every
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self.wal_path = os.path.join(directory, WAL_NAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+        # Comptes chargés : registre indexé par numéro (+ titulaire et solde)
+        self.accounts = AccountRegistry()
+        self.lsn = 0                 # numéro de la dernière opération journalisée
+        # Par thread : entrées de l'opération en cours (pending), imbrication des opérations
+        # (depth : transfer appelle withdraw/deposit) et des group_commit (group)
+        self._local = threading.local()
+        self._lock = threading.Lock()  # journal, compteurs et instantanés
+        self._unsynced = 0           # lignes écrites mais pas encore fsync
+        self._since_snapshot = 0
+        self._load_snapshot()
+        self._replay()
+        # État journalisé de chaque compte : (longueur d'historique, solde, plafond) ; c'est lui que
+        # l'instantané écrit, pas l'état en mémoire qu'un autre thread est peut-être en train de modifier
+        self._logged: Dict[int, Tuple[int, float, float]] = {
+            a.account_number: (len(a.liste_historique), a.balance, a.limit) for a in self.accounts.values()
+        }
+        self._wal = open(self.wal_path, "ab")
+
+    # --- Chargement ---
+    def _attach(self, account: Account) -> Account:
+        account.journal = self
+        self.accounts.add(account)
+        return account
+
+    def _load_snapshot(self) -> None:
+        try:
+            f = open(self.snapshot_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            header = json.loads(f.readline())
+            if header.get("version") != SNAPSHOT_VERSION or header.get("byteorder") != sys.byteorder:
+                raise ValueError(f"{self.snapshot_path} : instantané illisible sur cette machine")
+            self.lsn = header["lsn"]
+            accounts = []
+            for number, holder, balance, limit, size in header["accounts"]:
+                account = Account(holder, balance, limit, account_number=number)
+                account.journal = self
+                ledger = account.liste_historique
+                for column in (ledger.codes, ledger.amounts, ledger.timestamps, ledger.balances):
+                    column.fromfile(f, size)
+                accounts.append(account)
+            # Index du registre construits en une fois (un tri) plutôt que compte par compte
+            self.accounts = AccountRegistry(accounts, header.get("next_sequence", 0),
+                                            header.get("legacy_numbers", ()))
+
+    def _replay(self) -> None:
+        """Rejoue les opérations du journal postérieures à l'instantané ; tronque une fin de fichier abîmée."""
+        try:
+            f = open(self.wal_path, "rb")
+        except FileNotFoundError:
+            return
+        good = 0
+        with f:
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    break
+                good += len(line)
+                if record["lsn"] <= self.lsn:
+                    continue
+                for entry in record["ops"]:
+                    self._apply(entry)
+                self.lsn = record["lsn"]
+                self._since_snapshot += 1
+            end = f.seek(0, os.SEEK_END)
+        if good < end:
+            with open(self.wal_path, "r+b") as f:
+                f.truncate(good)
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[dict]:
+        if not line.endswith(b"\n") or len(line) < 10:
+            return None
+        crc, _, payload = line[:-1].partition(b" ")
+        try:
+            if int(crc, 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def _apply(self, entry: list) -> None:
+        kind = entry[0]
+        if kind == "h":
+            _, number, type_op, montant, timestamp, solde_apres = entry
+            account = self.accounts[number]
+            account.balance = solde_apres
+            if type_op == "modif_plafond":
+                account.limit = montant
+            account.liste_historique.append(type_op, montant, solde_apres, timestamp)
+            self.accounts.balance_changed(account)
+        elif kind == "create":
+            _, number, holder, balance, limit = entry
+            self._attach(Account(holder, balance, limit, account_number=number))
+        elif kind == "delete":
+            self.accounts.pop(entry[1]).journal = None
+        else:
+            raise ValueError(f"entrée de journal inconnue : {entry!r}")
+
+    # --- Journalisation (appelée par Account, qui détient alors les verrous des comptes touchés) ---
+    def _thread_state(self) -> threading.local:
+        local = self._local
+        if not hasattr(local, "pending"):
+            local.pending, local.depth, local.group = [], 0, 0
+        return local
+
+    @contextmanager
+    def operation(self) -> Iterator[None]:
+        """Regroupe les entrées d'une opération ; elles sont écrites en une ligne à la fin de la plus externe."""
+        local = self._thread_state()
+        local.depth += 1
+        try:
+            yield
+        finally:
+            local.depth -= 1
+            if local.depth == 0 and local.pending:
+                entries, local.pending = local.pending, []
+                self._write(entries, local.group)
+
+    def record_history(self, account: Account, type_op: str, montant: float, timestamp: float,
+                       solde_apres: Optional[float] = None) -> None:
+        """`solde_apres` : solde après cette ligne, si ce n'est pas le solde actuel (lignes ajoutées en bloc)."""
+        local = self._thread_state()
+        local.pending.append(["h", account.account_number, type_op, montant, timestamp,
+                              account.balance if solde_apres is None else solde_apres])
+        if local.depth == 0:
+            entries, local.pending = local.pending, []
+            self._write(entries, local.group)
+
+    def _write(self, entries: list, group: int = 0) -> None:
+        with self._lock:
+            self.lsn += 1
+            payload = json.dumps({"lsn": self.lsn, "ops": entries}, separators=(",", ":")).encode("utf-8")
+            self._wal.write(b"%08x %s\n" % (zlib.crc32(payload), payload))
+            for entry in entries:
+                if entry[0] == "delete":
+                    self._logged.pop(entry[1], None)
+                else:
+                    account = self.accounts[entry[1]]
+                    self._logged[entry[1]] = (len(account.liste_historique), account.balance, account.limit)
+            self._unsynced += 1
+            self._since_snapshot += 1
+            if not group and self._unsynced >= self.sync_every:
+                self._commit()
+
+    def commit(self) -> None:
+        """Rend durables les opérations déjà écrites (flush + fsync), puis prend un instantané si besoin."""
+        with self._lock:
+            self._commit()
+
+    def _commit(self) -> None:
+        if self._unsynced:
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._unsynced = 0
+        if self._since_snapshot >= self.snapshot_every:
+            self._snapshot()
+
+    @contextmanager
+    def group_commit(self, sync: bool = True) -> Iterator[None]:
+        """Un seul fsync pour toutes les opérations du bloc (ex. import d'un lot) lancées par ce thread.
+
+        sync=False : pas de fsync en sortie de bloc, l'appelant appellera commit() lui-même
+        (ex. depuis un autre thread, pour ne pas bloquer une boucle asyncio).
+        """
+        local = self._thread_state()
+        local.group += 1
+        try:
+            yield
+        finally:
+            local.group -= 1
+            if not local.group and sync:
+                self.commit()
+
+    # --- Comptes ---
+    def create_account(self, holder_name: str, balance: float = DEFAULT_BALANCE, limit: float = DEFAULT_LIMIT,
+                       account_number: Optional[int] = None) -> Account:
+        """Crée et journalise un compte ; son numéro est attribué par le registre (unique, sans nouvel essai)."""
+        with self._lock:
+            if account_number is None:
+                account_number = self.accounts.allocate_number()
+            account = Account(holder_name, balance, limit, account_number=account_number)
+            self._attach(account)
+        self._write([["create", account.account_number, account.holder_name, account.balance, account.limit]],
+                    self._thread_state().group)
+        return account
+
+    def delete_account(self, account: Account) -> None:
+        with account._lock:
+            with self._lock:
+                self.accounts.remove(account)
+            account.journal = None
+            self._write([["delete", account.account_number]], self._thread_state().group)
+
+    # --- Instantanés ---
+    def snapshot(self) -> None:
+        """Écrit l'état complet (instantané atomique), puis vide le journal."""
+        with self._lock:
+            self._snapshot()
+
+    def _snapshot(self) -> None:
+        if self._unsynced:
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._unsynced = 0
+        # État tel que journalisé jusqu'à self.lsn ; les historiques ne font que grandir,
+        # on n'en écrit donc que les `size` premières lignes
+        accounts = [(self.accounts[number], state) for number, state in self._logged.items()]
+        header = {
+            "version": SNAPSHOT_VERSION, "lsn": self.lsn, "byteorder": sys.byteorder,
+            # Rangs déjà attribués, y compris ceux de comptes supprimés : jamais réattribués
+            "next_sequence": self.accounts.next_sequence,
+            # Numéros antérieurs au registre, y compris de comptes supprimés : sautés par l'attribution
+            "legacy_numbers": sorted(self.accounts.legacy_numbers),
+            "accounts": [[a.account_number, a.holder_name, balance, limit, size]
+                         for a, (size, balance, limit) in accounts],
+        }
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            for account, (size, _, _) in accounts:
+                ledger = account.liste_historique
+                for column in (ledger.codes, ledger.amounts, ledger.timestamps, ledger.balances):
+                    column[:size].tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        _fsync_dir(self.directory)
+        # Les lignes du journal sont toutes couvertes par l'instantané (lsn) : on peut le vider
+        self._wal.truncate(0)
+        os.fsync(self._wal.fileno())
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._wal.close()
+
+    def __enter__(self) -> "BankStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,199 @@
+"""
+Listes virtuelles pour l'interface Tkinter
+---------------------------------------------------------
+- VirtualList : une Listbox qui ne contient que les lignes visibles ; les lignes sont
+  demandées (et mises en forme) au défilement, à partir de deux fonctions count() et row(i).
+  Afficher ou faire défiler 100k lignes coûte autant que 10 lignes
+- AccountListView : comptes du registre par ordre alphabétique, avec un champ de filtre
+  (début du nom du titulaire) appliqué à chaque frappe, en O(log n)
+
+"""
+
+# --- Imports ---
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+from typing import Callable, Optional
+
+from bank_engine import Account
+from bank_ledger import LedgerEntry
+from bank_registry import AccountRegistry
+
+
+def account_label(acc: Account) -> str:
+    """Texte d'un compte dans les listes : le numéro distingue les homonymes."""
+    return f"{acc.holder_name} ({acc.account_number})"
+
+
+def history_label(op: LedgerEntry) -> str:
+    """Texte d'une ligne d'historique (date mise en forme seulement pour les lignes affichées)."""
+    return f"{op.date} | {op.type} | {op.montant:.2f} € | Solde: {op.solde_apres:.2f} €"
+
+# =======================
+#   Liste virtuelle
+# =======================
+
+class VirtualList(ttk.Frame):
+    """Listbox + barre de défilement qui n'affichent que les lignes [top, top + rows)."""
+
+    def __init__(self, master: tk.Misc, count: Callable[[], int], row: Callable[[int], str],
+                 on_select: Optional[Callable[[], None]] = None, empty_text: str = "",
+                 height: int = 10, width: int = 30) -> None:
+        super().__init__(master)
+        self.count = count                   # nombre total de lignes
+        self.row = row                       # texte de la ligne de rang i
+        self.on_select = on_select
+        self.empty_text = empty_text         # affiché quand il n'y a aucune ligne
+        self.rows = height                   # lignes visibles
+        self.top = 0                         # rang de la première ligne affichée
+        self.selected: Optional[int] = None  # rang de la ligne sélectionnée
+        self.listbox = tk.Listbox(self, height=height, width=width, exportselection=False, activestyle="none")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._line_height = max(1, tkfont.Font(font=self.listbox.cget("font")).metrics("linespace"))
+
+        # La Listbox ne connaît que la fenêtre visible : défilement et clavier gérés ici
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", lambda e: self._scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.listbox.bind("<Button-4>", lambda _e: self._scroll_by(-1, "units"))
+        self.listbox.bind("<Button-5>", lambda _e: self._scroll_by(1, "units"))
+        self.listbox.bind("<Up>", lambda _e: self._move(-1))
+        self.listbox.bind("<Down>", lambda _e: self._move(1))
+        self.listbox.bind("<Prior>", lambda _e: self._move(-self.rows))
+        self.listbox.bind("<Next>", lambda _e: self._move(self.rows))
+        self.listbox.bind("<Home>", lambda _e: self._move(-self.count()))
+        self.listbox.bind("<End>", lambda _e: self._move(self.count()))
+
+    # --- Affichage ---
+    def render(self) -> None:
+        """Réécrit les seules lignes visibles et met à jour la barre de défilement."""
+        n = self.count()
+        self.top = max(0, min(self.top, n - self.rows))
+        end = min(n, self.top + self.rows)
+        self.listbox.delete(0, tk.END)
+        if n:
+            self.listbox.insert(tk.END, *(self.row(i) for i in range(self.top, end)))
+            if self.selected is not None and self.top <= self.selected < end:
+                self.listbox.selection_set(self.selected - self.top)
+            self.scrollbar.set(self.top / n, end / n)
+        else:
+            if self.empty_text:
+                self.listbox.insert(tk.END, self.empty_text)
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, top: int) -> None:
+        self.top = top
+        self.render()
+
+    def select(self, index: Optional[int], notify: bool = True) -> None:
+        """Sélectionne la ligne de rang `index` (None = aucune) et la rend visible."""
+        n = self.count()
+        self.selected = None if index is None or not n else max(0, min(index, n - 1))
+        if self.selected is not None:
+            if self.selected < self.top:
+                self.top = self.selected
+            elif self.selected >= self.top + self.rows:
+                self.top = self.selected - self.rows + 1
+        self.render()
+        if notify and self.on_select:
+            self.on_select()
+
+    # --- Événements ---
+    def _on_listbox_select(self, _event: tk.Event) -> None:
+        sel = self.listbox.curselection()
+        if sel and self.count():
+            self.selected = self.top + sel[0]
+            if self.on_select:
+                self.on_select()
+
+    def _on_resize(self, event: tk.Event) -> None:
+        rows = max(1, (event.height - 4) // self._line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.render()
+
+    def _on_scrollbar(self, action: str, value: str, what: str = "units") -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.count()))
+        else:
+            self._scroll_by(int(value), what)
+
+    def _scroll_by(self, amount: int, what: str) -> str:
+        self.scroll_to(self.top + amount * (self.rows if what == "pages" else 1))
+        return "break"
+
+    def _move(self, delta: int) -> str:
+        start = self.selected if self.selected is not None else self.top - (1 if delta > 0 else 0)
+        self.select(start + delta)
+        return "break"
+
+# =======================
+#   Liste des comptes
+# =======================
+
+class AccountListView(ttk.Frame):
+    """Champ de filtre + liste virtuelle des comptes du registre (ordre alphabétique des titulaires)."""
+
+    def __init__(self, master: tk.Misc, registry: AccountRegistry, on_select: Optional[Callable[[], None]] = None,
+                 height: int = 10, width: int = 30) -> None:
+        super().__init__(master)
+        self.registry = registry
+        self.on_select = on_select
+        self._range = registry.holder_range("")      # rangs [début, fin) des comptes filtrés
+        self._selected_number: Optional[int] = None
+
+        self.filter_var = tk.StringVar()
+        entry = ttk.Entry(self, textvariable=self.filter_var)
+        entry.pack(fill="x", pady=(0, 4))
+        self.filter_var.trace_add("write", lambda *_: self._apply_filter())
+
+        self.list = VirtualList(self, count=lambda: self._range[1] - self._range[0], row=self._row,
+                                on_select=self._on_list_select, empty_text="Aucun compte.",
+                                height=height, width=width)
+        self.list.pack(fill=tk.BOTH, expand=True)
+        self.list.render()
+
+    def _row(self, i: int) -> str:
+        return account_label(self.registry.holder_at(self._range[0] + i))
+
+    def _on_list_select(self) -> None:
+        index = self.list.selected
+        self._selected_number = (None if index is None
+                                 else self.registry.holder_at(self._range[0] + index).account_number)
+        if self.on_select:
+            self.on_select()
+
+    def _apply_filter(self) -> None:
+        """À chaque frappe : nouvelle plage de rangs, puis sélection du premier compte correspondant."""
+        self._range = self.registry.holder_range(self.filter_var.get())
+        self.list.top = 0
+        self.list.select(0)
+
+    def selected_account(self) -> Optional[Account]:
+        return None if self._selected_number is None else self.registry.get(self._selected_number)
+
+    def refresh(self, select_number: Optional[int] = None) -> None:
+        """Relit le registre (compte ajouté ou supprimé) ; garde ou change la sélection."""
+        self._range = self.registry.holder_range(self.filter_var.get())
+        if select_number is not None:
+            self._selected_number = select_number
+            position = self.registry.holder_position(self.registry[select_number])
+            if not self._range[0] <= position < self._range[1]:
+                # Compte hors du filtre en cours : on efface le filtre pour le montrer
+                self.filter_var.set("")
+                self._range = self.registry.holder_range("")
+                self._selected_number = select_number
+        account = self.selected_account()
+        index = None
+        if account is not None:
+            position = self.registry.holder_position(account) - self._range[0]
+            if 0 <= position < self._range[1] - self._range[0]:
+                index = position
+        if index is None:
+            self._selected_number = None
+        self.list.select(index, notify=False)
+
+    def select_first(self) -> None:
+        self.list.select(0)
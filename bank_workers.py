@@ -0,0 +1,194 @@
+"""
+Exécution en arrière-plan pour l'interface (sans dépendance à Tkinter)
+---------------------------------------------------------
+- WorkerPool : les opérations sur les comptes et les imports de lots tournent sur des
+  threads de travail ; leurs résultats reviennent dans une file que le thread de
+  l'interface vide régulièrement (pump(), appelé par BankApp via self.after())
+- run_serial : les opérations de l'interface passent par un thread unique, dans l'ordre
+  des clics (un dépôt puis un retrait sur le même compte ne peuvent pas s'inverser) ;
+  les autres threads restent aux tâches longues comme import_batch
+- pump() s'arrête au bout d'un budget de temps : la fenêtre reste fluide même quand
+  beaucoup de résultats arrivent d'un coup
+- Job : avancement (lignes traitées / total) et annulation d'une tâche longue
+- import_batch : applique un fichier d'opérations en rendant compte de l'avancement,
+  un fsync du journal par paquet de lignes, interruptible entre deux lignes
+
+"""
+
+# --- Imports ---
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bank_engine import Account, OperationResult, iter_batch, read_operations
+
+# --- Constantes par défaut ---
+WORKERS: int = 4                             # threads de travail
+PUMP_BUDGET: float = 0.008                   # secondes de rappels au plus par appel à pump()
+PROGRESS_EVERY: int = 1000                   # lignes entre deux mises à jour de l'avancement
+COMMIT_EVERY: int = 5000                     # lignes par fsync du journal pendant un import
+
+# =======================
+#   Tâche
+# =======================
+
+class Job:
+    """Suivi d'une tâche : avancement, annulation, résultat ou erreur."""
+
+    def __init__(self) -> None:
+        self._cancel = threading.Event()
+        self.done = 0                        # unités traitées (ex. lignes d'un lot)
+        self.total: Optional[int] = None     # total attendu, None = inconnu
+        self.finished = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def cancel(self) -> None:
+        """Demande l'arrêt ; la tâche le constate à son prochain point de contrôle."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, done: int, total: Optional[int] = None) -> None:
+        """Appelé par la tâche ; l'interface relit done / total quand elle se redessine."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+# =======================
+#   Pool de threads
+# =======================
+
+class WorkerPool:
+    def __init__(self, workers: int = WORKERS, on_error: Optional[Callable[[BaseException], None]] = None) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bank-worker")
+        # File d'attente unique des opérations de l'interface : exécutées une par une, dans l'ordre
+        self._serial = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bank-serial")
+        # Rappels à exécuter sur le thread de l'interface : (fonction, argument)
+        self._results: "queue.SimpleQueue[Tuple[Callable[[Any], None], Any]]" = queue.SimpleQueue()
+        self._jobs: Dict[Job, None] = {}     # tâches en cours (annulées à la fermeture)
+        self._lock = threading.Lock()
+        self.on_error = on_error
+
+    def run(self, fn: Callable[..., Any], *args: Any, on_done: Optional[Callable[[Any], None]] = None,
+            on_error: Optional[Callable[[BaseException], None]] = None) -> Job:
+        """Exécute fn(*args) sur un thread de travail ; on_done(résultat) sera appelé par pump()."""
+        job = Job()
+        return self._submit(job, lambda: fn(*args), on_done, on_error)
+
+    def run_serial(self, fn: Callable[..., Any], *args: Any, on_done: Optional[Callable[[Any], None]] = None,
+                   on_error: Optional[Callable[[BaseException], None]] = None) -> Job:
+        """Comme run(), mais sur le thread unique des opérations : exécutées dans l'ordre de soumission."""
+        job = Job()
+        return self._submit(job, lambda: fn(*args), on_done, on_error, self._serial)
+
+    def start_job(self, fn: Callable[..., Any], *args: Any, on_done: Optional[Callable[[Any], None]] = None,
+                  on_error: Optional[Callable[[BaseException], None]] = None) -> Job:
+        """Comme run(), mais fn reçoit le Job en premier argument (avancement, annulation)."""
+        job = Job()
+        return self._submit(job, lambda: fn(job, *args), on_done, on_error)
+
+    def _submit(self, job: Job, call: Callable[[], Any], on_done: Optional[Callable[[Any], None]],
+                on_error: Optional[Callable[[BaseException], None]],
+                executor: Optional[ThreadPoolExecutor] = None) -> Job:
+        with self._lock:
+            self._jobs[job] = None
+        (executor or self._executor).submit(self._execute, job, call, on_done, on_error or self.on_error)
+        return job
+
+    def _execute(self, job: Job, call: Callable[[], Any], on_done: Optional[Callable[[Any], None]],
+                 on_error: Optional[Callable[[BaseException], None]]) -> None:
+        try:
+            job.result = call()
+        except Exception as exc:
+            job.error = exc
+            self._results.put((on_error or self._print_error, exc))
+        else:
+            if on_done is not None:
+                self._results.put((on_done, job.result))
+        finally:
+            job.finished = True
+            with self._lock:
+                self._jobs.pop(job, None)
+
+    @staticmethod
+    def _print_error(exc: BaseException) -> None:
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+    def pump(self, budget: float = PUMP_BUDGET) -> int:
+        """À appeler depuis le thread de l'interface : exécute les rappels en attente, dans la limite du budget."""
+        deadline = time.perf_counter() + budget
+        count = 0
+        while True:
+            try:
+                callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            callback(value)
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+        return count
+
+    def shutdown(self) -> None:
+        """Annule les tâches longues en cours et attend la fin des threads."""
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.cancel()
+        self._serial.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+
+# =======================
+#   Import d'un lot
+# =======================
+
+def count_operations(path: str) -> int:
+    """Nombre de lignes d'opérations d'un fichier (sans l'en-tête CSV), lu par blocs."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1                           # dernière ligne sans saut de ligne
+    return max(0, lines - 1) if path.endswith(".csv") else lines
+
+
+def import_batch(job: Job, accounts: Dict[str, Account], path: str,
+                 group_commit: Optional[Callable[[], Any]] = None) -> Tuple[List[Tuple[int, OperationResult]], int]:
+    """Applique un fichier d'opérations ; renvoie (lignes en échec, lignes traitées).
+
+    `group_commit` : fabrique de contexte (ex. BankStore.group_commit) ; un fsync par COMMIT_EVERY lignes.
+    S'arrête proprement entre deux lignes si job.cancel() a été demandé : les lignes déjà
+    appliquées le restent.
+    """
+    job.report(0, count_operations(path))
+    errors: List[Tuple[int, OperationResult]] = []
+    processed = 0
+    results = iter_batch(accounts, read_operations(path))
+    while not job.cancelled:
+        with group_commit() if group_commit is not None else nullcontext():
+            for processed, result in results:
+                if not result:
+                    errors.append((processed, result))
+                if processed % PROGRESS_EVERY == 0:
+                    job.report(processed)
+                if processed % COMMIT_EVERY == 0 or job.cancelled:
+                    break
+            else:
+                job.report(processed)
+                break
+    job.report(processed)
+    return errors, processed
@@ -0,0 +1,541 @@
+"""
+Banc d'essai du moteur bancaire (bank_engine.py, bank_storage.py)
+---------------------------------------------------------
+- recovery : un processus fils enchaîne des opérations sur un BankStore et annonce
+  chacune une fois acquise (après fsync) ; il est tué (SIGKILL) au hasard, une fin de
+  ligne à moitié écrite est ajoutée au journal, puis le magasin est rouvert : chaque
+  opération annoncée doit s'y retrouver et la ligne abîmée doit être tronquée.
+  Plusieurs tours de suite, avec des instantanés fréquents, couvrent aussi
+  « instantané + rejeu de la fin du journal ».
+- stress : des transferts aléatoires (dans les deux sens entre les mêmes comptes) lancés
+  par 1, 2, 4... threads ; vérifie que l'argent total est conservé, qu'aucun solde n'est
+  négatif et que chaque transfert est historisé des deux côtés ; mesure le débit
+- registry : construit un AccountRegistry de 100k, 1M... comptes et mesure le temps par
+  recherche (numéro, titulaire, préfixe, tranche de soldes) et par mise à jour de solde,
+  à comparer avec un parcours linéaire de tous les comptes
+- ui : import d'un lot de 100k opérations sur un WorkerPool pendant que le thread
+  principal simule la boucle Tk (pompe toutes les 16 ms) ; mesure l'écart entre deux
+  images (p99, max), comparé à un import fait directement sur le thread principal
+- statements : 100k comptes avec un historique étalé sur trois mois ; mesure le relevé de
+  fin de mois de tous les comptes (un seul passage) et le temps d'un « solde au temps T »
+  par recherche dichotomique, comparé à un parcours de l'historique
+- eod : traitement de fin de journée (bank_eod.py) sur 1M comptes d'un registre, avec NumPy
+  (s'il est installé) puis avec le repli array ; durée de chaque phase et latence des paquets,
+  comparées à la boucle dépôt / retrait / set_limit compte par compte
+- server : lance bank_server.py (socket Unix, journal neuf) et le client de charge pour
+  plusieurs profondeurs de pipeline ; mesure ops/s et latences p50 / p99
+- Ajoute les résultats en JSON Lines dans un fichier, pour suivre les régressions
+
+Les scénarios sont des entrées de SCENARIOS : un nouveau scénario s'ajoute en une ligne.
+
+Exemple :
+    python bench_bank.py --scenarios recovery --rounds 5 --duration 2
+    python bench_bank.py --scenarios stress --threads 1,2,4,8,16 --ops 200000
+    python bench_bank.py --scenarios server --connections 8 --pipelines 1,8,32
+    python bench_bank.py --scenarios registry --sizes 100k,1M
+    python bench_bank.py --scenarios ui --ops 100000
+    python bench_bank.py --scenarios statements --statement-accounts 100k --history 60
+    python bench_bank.py --scenarios eod --eod-accounts 1M
+"""
+
+# --- Imports ---
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import bank_server
+import bank_eod
+from bank_engine import Account
+from bank_ledger import OP_TYPES
+from bank_registry import AccountRegistry
+from bank_statements import balance_at, export_statements, month_bounds
+from bank_storage import BankStore, WAL_NAME
+from bank_workers import Job, WorkerPool, import_batch
+from bench_common import git_commit, parse_size
+
+# --- Constantes par défaut ---
+ROOT = os.path.dirname(os.path.abspath(__file__))
+WORK_DIR = os.path.join(ROOT, "bench_work")
+RESULTS_PATH = os.path.join(WORK_DIR, "bench_bank_results.jsonl")     # bench_work/ est ignoré par git
+OPERATIONS = ("deposit", "withdraw", "transfer", "set_limit")
+
+
+# =======================
+#   Scénario : recovery
+# =======================
+def recovery_child(directory, accounts, snapshot_every, seed):
+    """Exécuté dans le processus fils : opérations aléatoires jusqu'à être tué.
+
+    Après chaque opération acquise, une ligne "lsn numéro longueur_historique solde" par
+    compte modifié : c'est ce que l'opération garantit avoir rendu durable.
+    """
+    rng = random.Random(seed)
+    store = BankStore(directory, sync_every=1, snapshot_every=snapshot_every)
+    while len(store.accounts) < accounts:
+        store.create_account(f"Client {len(store.accounts)}")
+    pool = list(store.accounts.values())
+    out = sys.stdout
+    while True:
+        op = rng.choice(OPERATIONS)
+        account = rng.choice(pool)
+        touched = [account]
+        if op == "transfer":
+            target = rng.choice(pool)
+            touched.append(target)
+            result = account.transfer(rng.randint(1, 500), target)
+        elif op == "set_limit":
+            result = account.set_limit(rng.randint(500, 2000))
+        else:
+            result = getattr(account, op)(rng.randint(1, 500))
+        if not result:
+            continue
+        # sync_every=1 : l'opération est déjà fsync quand on arrive ici
+        for acc in touched:
+            out.write(f"{store.lsn} {acc.account_number} {len(acc.liste_historique)} {acc.balance!r}\n")
+        out.flush()
+
+
+def recovery_round(directory, accounts, snapshot_every, duration, seed):
+    """Un tour : lance le fils, le tue, abîme la fin du journal, rouvre et vérifie."""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", "recovery", directory,
+         str(accounts), str(snapshot_every), str(seed)],
+        stdout=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + duration
+    acked = {}                                   # numéro -> (lsn, longueur d'historique, solde)
+    last_lsn = 0
+
+    def read_ack(line):
+        nonlocal last_lsn
+        if not line.endswith(b"\n"):
+            return                               # ligne coupée par le SIGKILL : non annoncée
+        lsn, number, length, balance = line.split()
+        acked[int(number)] = (int(lsn), int(length), float(balance))
+        last_lsn = max(last_lsn, int(lsn))
+
+    while time.monotonic() < deadline:
+        line = proc.stdout.readline()
+        if not line:
+            break
+        read_ack(line)
+    proc.send_signal(signal.SIGKILL)
+    for line in proc.stdout:
+        read_ack(line)
+    proc.stdout.close()
+    proc.wait()
+
+    # Écriture interrompue en plein milieu d'une ligne
+    wal_path = os.path.join(directory, WAL_NAME)
+    with open(wal_path, "ab") as f:
+        f.write(b'0badc0de {"lsn":')
+    torn_size = os.path.getsize(wal_path)
+
+    start = time.perf_counter()
+    store = BankStore(directory, snapshot_every=snapshot_every)
+    open_s = time.perf_counter() - start
+    lost = 0
+    for number, (lsn, length, balance) in acked.items():
+        account = store.accounts.get(number)
+        ledger = account.liste_historique if account is not None else None
+        if ledger is None or len(ledger) < length or ledger.balances[length - 1] != balance:
+            lost += 1
+    operations = sum(len(a.liste_historique) for a in store.accounts.values())
+    store.close()
+    wal_size = os.path.getsize(wal_path)
+    snapshot_path = os.path.join(directory, "snapshot.bin")
+    return {
+        "acked_lsn": last_lsn, "recovered_lsn": store.lsn, "lost": lost,
+        "torn_tail_truncated": wal_size < torn_size,
+        "operations": operations, "open_s": open_s, "wal_bytes": wal_size,
+        "snapshot_bytes": os.path.getsize(snapshot_path) if os.path.exists(snapshot_path) else 0,
+    }
+
+
+def run_recovery(args):
+    directory = os.path.join(WORK_DIR, "bank-recovery")
+    shutil.rmtree(directory, ignore_errors=True)
+    rows = []
+    print(f"{'tour':>4} {'lsn acquis':>10} {'lsn relu':>10} {'perdues':>8} {'opérations':>11} "
+          f"{'ouverture (s)':>14} {'journal (Ko)':>13}")
+    for round_ in range(args.rounds):
+        result = recovery_round(directory, args.accounts, args.snapshot_every, args.duration,
+                                args.seed + round_)
+        print(f"{round_:>4} {result['acked_lsn']:>10} {result['recovered_lsn']:>10} {result['lost']:>8} "
+              f"{result['operations']:>11} {result['open_s']:>14.3f} {result['wal_bytes'] / 1024:>13.1f}")
+        if result["lost"] or result["recovered_lsn"] < result["acked_lsn"] or not result["torn_tail_truncated"]:
+            raise SystemExit(f"tour {round_} : opérations acquises perdues ou journal non réparé")
+        rows.append({"round": round_, "accounts": args.accounts, "snapshot_every": args.snapshot_every, **result})
+    return rows
+
+
+# =======================
+#   Scénario : stress
+# =======================
+def stress_round(accounts, threads, operations, seed, timeout):
+    """Lance `operations` transferts aléatoires répartis sur `threads` threads ; renvoie la durée."""
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(operations // threads):
+            source, target = rng.sample(accounts, 2)
+            source.transfer(rng.randint(1, 300), target)
+
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join(timeout)
+        if thread.is_alive():
+            raise SystemExit(f"{threads} threads : transferts bloqués depuis {timeout} s (interblocage ?)")
+    return time.perf_counter() - start
+
+
+def run_stress(args):
+    rows = []
+    baseline = None
+    print(f"{'threads':>7} {'transferts':>10} {'réussis':>9} {'temps (s)':>10} {'ops/s':>10} {'accélération':>13}")
+    for threads in (int(t) for t in args.threads.split(",") if t):
+        accounts = [Account(f"Client {i}", 1000.0, 500.0) for i in range(args.accounts)]
+        total = sum(a.balance for a in accounts)
+        wall = stress_round(accounts, threads, args.ops, args.seed, args.timeout)
+        sent = sum(a.liste_historique.codes.count(2) for a in accounts)       # transfert_sortant
+        received = sum(a.liste_historique.codes.count(3) for a in accounts)   # transfert_entrant
+        conserved = abs(sum(a.balance for a in accounts) - total) < 1e-6
+        if not conserved or sent != received or min(a.balance for a in accounts) < 0:
+            raise SystemExit(f"{threads} threads : argent créé ou perdu ({sum(a.balance for a in accounts)} != {total}),"
+                             f" {sent} transferts sortants / {received} entrants")
+        ops = (args.ops // threads) * threads
+        rate = ops / wall
+        baseline = baseline or rate
+        print(f"{threads:>7} {ops:>10} {sent:>9} {wall:>10.3f} {rate:>10.0f} {rate / baseline:>13.2f}")
+        rows.append({"threads": threads, "accounts": args.accounts, "operations": ops, "succeeded": sent,
+                     "wall_s": wall, "ops_per_s": rate, "speedup": rate / baseline, "conserved": conserved})
+    return rows
+
+
+# =======================
+#   Scénario : registry
+# =======================
+def per_call_us(function, keys):
+    start = time.perf_counter()
+    for key in keys:
+        function(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def run_registry(args):
+    rows = []
+    print(f"{'comptes':>9} {'construction (s)':>16} {'numéro (µs)':>12} {'titulaire':>10} {'préfixe':>8} "
+          f"{'soldes':>8} {'dépôt':>8} {'parcours (µs)':>14}")
+    for size in (parse_size(s) for s in args.sizes.split(",") if s):
+        rng = random.Random(args.seed)
+        numbers = AccountRegistry()
+        accounts = [Account(f"Client {rng.randrange(size)}", rng.randint(0, 10_000), 1000.0,
+                            account_number=numbers.allocate_number()) for _ in range(size)]
+        start = time.perf_counter()
+        registry = AccountRegistry(accounts)
+        build = time.perf_counter() - start
+        sample = [rng.choice(accounts) for _ in range(args.lookups)]
+        timings = {
+            "by_number_us": per_call_us(registry.get, [a.account_number for a in sample]),
+            "by_holder_us": per_call_us(registry.find_holder, [a.holder_name for a in sample]),
+            "prefix_us": per_call_us(lambda p: registry.search_holder(p, limit=20),
+                                     [a.holder_name[:9] for a in sample]),
+            "balance_range_us": per_call_us(lambda b: registry.by_balance(b, b + 100, limit=20),
+                                            [a.balance for a in sample]),
+            "deposit_us": per_call_us(lambda a: a.deposit(1), sample),
+            # Référence : ce que coûterait une recherche sans index
+            "linear_scan_us": per_call_us(lambda n: next(a for a in accounts if a.account_number == n),
+                                          [a.account_number for a in sample[:5]]),
+        }
+        print(f"{size:>9} {build:>16.2f} {timings['by_number_us']:>12.2f} {timings['by_holder_us']:>10.2f} "
+              f"{timings['prefix_us']:>8.2f} {timings['balance_range_us']:>8.2f} {timings['deposit_us']:>8.2f} "
+              f"{timings['linear_scan_us']:>14.0f}")
+        rows.append({"accounts": size, "build_s": build, "lookups": args.lookups, **timings})
+    return rows
+
+
+# =======================
+#   Scénario : ui
+# =======================
+FRAME_S = 0.016                              # intervalle de la pompe self.after() de BankApp
+
+
+def write_operations(path, names, count, seed):
+    """Fichier JSON Lines de `count` opérations aléatoires sur les comptes `names`."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(count):
+            op = rng.choice(OPERATIONS)
+            row = {"op": op, "account": rng.choice(names), "amount": rng.randint(1, 500)}
+            if op == "transfer":
+                row["target"] = rng.choice(names)
+            f.write(json.dumps(row) + "\n")
+
+
+def frame_gaps(run_import):
+    """Simule la boucle de l'interface pendant `run_import(pool)` ; renvoie (durée, écarts entre images)."""
+    pool = WorkerPool()
+    start = time.perf_counter()
+    job = run_import(pool)
+    gaps = []
+    last = time.perf_counter()
+    while not job.finished:
+        time.sleep(FRAME_S)
+        pool.pump()
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+    wall = time.perf_counter() - start
+    pool.shutdown()
+    if job.error:
+        raise job.error
+    return wall, sorted(gaps) or [wall]
+
+
+def run_ui(args):
+    directory = os.path.join(WORK_DIR, "bank-ui")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    rows = []
+    print(f"{'mode':<12} {'opérations':>10} {'import (s)':>10} {'images':>7} {'p99 (ms)':>9} {'max (ms)':>9}")
+    for mode in ("worker", "main-thread"):
+        store = BankStore(os.path.join(directory, mode))
+        names = [store.create_account(f"Client {i}").holder_name for i in range(args.accounts)]
+        path = os.path.join(directory, "ops.jsonl")
+        write_operations(path, names, args.ops, args.seed)
+        if mode == "worker":
+            wall, gaps = frame_gaps(lambda pool: pool.start_job(import_batch, store.accounts, path, store.group_commit))
+        else:
+            # Référence : l'import bloque le thread de l'interface jusqu'à la fin
+            start = time.perf_counter()
+            import_batch(Job(), store.accounts, path, store.group_commit)
+            wall = time.perf_counter() - start
+            gaps = [wall]
+        store.close()
+        p99 = gaps[min(len(gaps) - 1, int(len(gaps) * 0.99))]
+        print(f"{mode:<12} {args.ops:>10} {wall:>10.2f} {len(gaps):>7} {p99 * 1000:>9.1f} {gaps[-1] * 1000:>9.1f}")
+        rows.append({"mode": mode, "operations": args.ops, "accounts": args.accounts, "wall_s": wall,
+                     "frames": len(gaps), "p99_frame_ms": p99 * 1000, "max_frame_ms": gaps[-1] * 1000})
+    shutil.rmtree(directory, ignore_errors=True)
+    return rows
+
+
+# =======================
+#   Scénario : statements
+# =======================
+def synthetic_accounts(count, history, start, end, seed):
+    """Comptes avec `history` opérations chacun, à des dates aléatoires croissantes entre start et end."""
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        account = Account(f"Client {i}", 1000.0, 1000.0)
+        ledger = account.liste_historique
+        balance = account.balance
+        for timestamp in sorted(rng.uniform(start, end) for _ in range(history)):
+            amount = float(rng.randint(1, 300))
+            if rng.random() < 0.5 or amount > balance:
+                balance += amount
+                ledger.append(OP_TYPES[1], amount, balance, timestamp)      # depot
+            else:
+                balance -= amount
+                ledger.append(OP_TYPES[0], amount, balance, timestamp)      # retrait
+        account.balance = balance
+        accounts.append(account)
+    return accounts
+
+
+def run_statements(args):
+    directory = os.path.join(WORK_DIR, "bank-statements")
+    os.makedirs(directory, exist_ok=True)
+    count = parse_size(args.statement_accounts)
+    # Trois mois d'historique ; relevé du mois du milieu
+    start, _ = month_bounds("2026-07")
+    month_start, month_end = month_bounds("2026-08")
+    _, end = month_bounds("2026-09")
+    began = time.perf_counter()
+    accounts = synthetic_accounts(count, args.history, start, end, args.seed)
+    build = time.perf_counter() - began
+    print(f"{count} comptes x {args.history} opérations générés en {build:.1f} s")
+    print(f"{'format':<7} {'comptes':>9} {'opérations':>11} {'temps (s)':>10} {'comptes/s':>10} {'sortie (Mo)':>12}")
+    rows = []
+    for fmt in ("csv", "jsonl"):
+        path = os.path.join(directory, f"releves-2026-08.{fmt}")
+        began = time.perf_counter()
+        n_accounts, n_operations = export_statements(accounts, month_start, month_end, path)
+        wall = time.perf_counter() - began
+        size = os.path.getsize(path)
+        os.remove(path)
+        print(f"{fmt:<7} {n_accounts:>9} {n_operations:>11} {wall:>10.2f} {n_accounts / wall:>10.0f} {size / 1e6:>12.1f}")
+        rows.append({"format": fmt, "accounts": n_accounts, "history": args.history, "operations": n_operations,
+                     "wall_s": wall, "output_bytes": size})
+    rng = random.Random(args.seed)
+    sample = [(rng.choice(accounts), rng.uniform(start, end)) for _ in range(args.lookups)]
+    indexed = per_call_us(lambda item: balance_at(*item), sample)
+    linear = per_call_us(lambda item: [e.solde_apres for e in item[0].liste_historique if e.timestamp <= item[1]],
+                         sample[:1000])
+    print(f"solde au temps T : {indexed:.2f} µs (recherche dichotomique), {linear:.2f} µs (parcours)")
+    rows.append({"query": "balance_at", "history": args.history, "indexed_us": indexed, "linear_us": linear})
+    return rows
+
+
+# =======================
+#   Scénario : eod
+# =======================
+EOD_RULES = bank_eod.EodRules(annual_rate=0.02, fee=2.0, fee_below=500.0, limit_min=200.0, limit_max=3000.0)
+
+
+def naive_end_of_day(accounts, rules):
+    """Référence : les mêmes règles appliquées compte par compte avec les méthodes d'Account."""
+    for account in accounts:
+        interest = round(account.balance * rules.daily_rate, 2) if account.balance > 0 else 0.0
+        if interest:
+            account.deposit(interest)
+        if account.balance < rules.fee_below and rules.fee:
+            account.withdraw(min(rules.fee, account.balance))
+        new_limit = min(max(account.limit, rules.limit_min), rules.limit_max)
+        if new_limit != account.limit:
+            account.set_limit(new_limit)
+
+
+def run_eod(args):
+    size = parse_size(args.eod_accounts)
+    rng = random.Random(args.seed)
+    numbers = AccountRegistry()
+    began = time.perf_counter()
+    registry = AccountRegistry(
+        Account(f"Client {i}", rng.choice((0.0, 120.0, 480.0, 2500.0, 40_000.0)), rng.choice((100.0, 1000.0, 5000.0)),
+                account_number=numbers.allocate_number())
+        for i in range(size))
+    accounts = registry.values()
+    print(f"{size} comptes créés en {time.perf_counter() - began:.1f} s")
+    backends = ([True] if bank_eod.np is not None else []) + [False]
+    print(f"{'moteur':<8} {'total (s)':>9} {'copie':>7} {'calcul':>7} {'historique':>10} {'index':>7} "
+          f"{'modifiés':>9} {'paquet p99 (ms)':>16}")
+    rows = []
+    for use_numpy in backends:
+        report = bank_eod.run_end_of_day(accounts, EOD_RULES, use_numpy=use_numpy)
+        total = sum(report.timings.values())
+        t = report.timings
+        print(f"{report.backend:<8} {total:>9.2f} {t['copie']:>7.2f} {t['calcul']:>7.2f} {t['historique']:>10.2f} "
+              f"{t['index']:>7.2f} {report.changed:>9} {report.latency(0.99) * 1000:>16.1f}")
+        rows.append({"backend": report.backend, "accounts": size, "changed": report.changed, "rows": report.rows,
+                     "wall_s": total, **{f"{name}_s": seconds for name, seconds in t.items()},
+                     "chunk_p50_ms": report.latency(0.5) * 1000, "chunk_p99_ms": report.latency(0.99) * 1000})
+    began = time.perf_counter()
+    naive_end_of_day(accounts, EOD_RULES)
+    naive = time.perf_counter() - began
+    print(f"{'boucle':<8} {naive:>9.2f}")
+    rows.append({"backend": "boucle", "accounts": size, "wall_s": naive})
+    return rows
+
+
+# =======================
+#   Scénario : server
+# =======================
+def run_server(args):
+    directory = os.path.join(WORK_DIR, "bank-server")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    socket_path = os.path.join(directory, "bank.sock")
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "bank_server.py"), "serve", "--unix", socket_path,
+                             "--data", os.path.join(directory, "data"), "--accounts", str(args.accounts)])
+    rows = []
+    try:
+        deadline = time.monotonic() + 30
+        while not os.path.exists(socket_path):
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise SystemExit("le serveur n'a pas démarré")
+            time.sleep(0.05)
+        print(f"{'connexions':>10} {'pipeline':>8} {'requêtes':>9} {'ops/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        for pipeline in (int(p) for p in args.pipelines.split(",") if p):
+            result = asyncio.run(bank_server.run_load(unix_path=socket_path, connections=args.connections,
+                                                      pipeline=pipeline, operations=args.ops,
+                                                      accounts=args.accounts, seed=args.seed))
+            print(f"{args.connections:>10} {pipeline:>8} {result['operations']:>9} {result['ops_per_s']:>10.0f} "
+                  f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+            rows.append({"accounts": args.accounts, **result})
+    finally:
+        proc.terminate()
+        proc.wait()
+    return rows
+
+
+# nom -> (fonction principale(args) -> lignes de résultat, fonction du processus fils ou None)
+SCENARIOS = {
+    "recovery": (run_recovery, recovery_child),
+    "stress": (run_stress, None),
+    "server": (run_server, None),
+    "registry": (run_registry, None),
+    "ui": (run_ui, None),
+    "statements": (run_statements, None),
+    "eod": (run_eod, None),
+}
+
+
+# =======================
+#   Mesures
+# =======================
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du moteur bancaire.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="scénarios à lancer (séparés par des virgules)")
+    parser.add_argument("--accounts", type=int, default=50, help="nombre de comptes (défaut : 50)")
+    parser.add_argument("--rounds", type=int, default=5, help="recovery : nombre de plantages simulés (défaut : 5)")
+    parser.add_argument("--duration", type=float, default=2.0, help="recovery : secondes avant chaque SIGKILL (défaut : 2)")
+    parser.add_argument("--snapshot-every", type=int, default=2_000,
+                        help="recovery : opérations entre deux instantanés (défaut : 2000)")
+    parser.add_argument("--threads", default="1,2,4,8", help="stress : nombres de threads (défaut : 1,2,4,8)")
+    parser.add_argument("--ops", type=int, default=200_000,
+                        help="stress, server : opérations par mesure (défaut : 200000)")
+    parser.add_argument("--connections", type=int, default=8, help="server : connexions simultanées (défaut : 8)")
+    parser.add_argument("--pipelines", default="1,8,32",
+                        help="server : requêtes en vol par connexion à mesurer (défaut : 1,8,32)")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="stress : secondes avant de déclarer un interblocage (défaut : 60)")
+    parser.add_argument("--sizes", default="100k,1M", help="registry : nombres de comptes (défaut : 100k,1M)")
+    parser.add_argument("--lookups", type=int, default=20_000, help="registry : recherches par mesure (défaut : 20000)")
+    parser.add_argument("--statement-accounts", default="100k",
+                        help="statements : nombre de comptes (défaut : 100k)")
+    parser.add_argument("--history", type=int, default=60, help="statements : opérations par compte (défaut : 60)")
+    parser.add_argument("--eod-accounts", default="1M", help="eod : nombre de comptes (défaut : 1M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=RESULTS_PATH, help="fichier JSON Lines où ajouter les résultats")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        name, *params = args.child
+        SCENARIOS[name][1](params[0], *map(int, params[1:]))
+        return
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"scénarios inconnus : {', '.join(unknown)} (choix : {', '.join(SCENARIOS)})")
+    commit = git_commit()
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "a", encoding="utf-8") as results:
+        for scenario in scenarios:
+            for row in SCENARIOS[scenario][0](args):
+                row = {
+                    "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "commit": commit, "python": sys.version.split()[0], "scenario": scenario, **row,
+                }
+                results.write(json.dumps(row) + "\n")
+                results.flush()
+
+
+# =======================
+#   Point d'entrée
+# =======================
+if __name__ == "__main__":
+    main()
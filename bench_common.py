@@ -0,0 +1,29 @@
+"""
+Outils communs aux bancs d'essai (bench_bank.py, bench_movie_wiki.py)
+---------------------------------------------------------
+- parse_size : tailles lisibles en ligne de commande ('10k', '1M')
+- git_commit : commit courant, noté dans chaque résultat pour suivre les régressions
+
+"""
+
+# --- Imports ---
+import os
+import subprocess
+
+# --- Constantes par défaut ---
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000."""
+    text = text.strip()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,251 @@
+"""
+Banc d'essai des implémentations de movie_wiki.py (Mariam/, Hela/, Andrea orlane/)
+---------------------------------------------------------
+- Génère des wiki_movie_plots.json synthétiques (10k, 1M, 10M films...) avec une
+  répartition des origines réglable
+- Lance chaque étape (load, classify, save) de chaque implémentation dans un processus
+  séparé et mesure : temps réel, pic de mémoire (RSS), octets écrits
+- Ajoute les résultats en JSON Lines dans un fichier, pour suivre les régressions
+
+Les modes ajoutés à Hela/ (index, parallèle, cache, requêtes, JSON Lines compressé) sont
+des entrées de VARIANTS comme les autres : un nouveau mode s'ajoute en une ligne.
+
+Exemple :
+    python bench_movie_wiki.py --sizes 10k,1M --variants hela,hela-cache --repeat 2
+"""
+
+# --- Imports ---
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from bench_common import git_commit, parse_size
+
+# --- Constantes par défaut ---
+ROOT = os.path.dirname(os.path.abspath(__file__))
+WORK_DIR = os.path.join(ROOT, "bench_work")
+RESULTS_PATH = os.path.join(WORK_DIR, "bench_results.jsonl")     # bench_work/ est ignoré par git
+DEFAULT_SIZES = "10k,1M,10M"
+DEFAULT_ORIGINS = "American:0.45,British:0.12,Indian:0.15,Japanese:0.08,French:0.08,Bollywood:0.07,Tamil:0.05"
+ORIGIN = "British"
+WORDS = ("the", "a", "man", "woman", "city", "war", "love", "murder", "ship", "family", "secret",
+         "train", "king", "island", "detective", "ghost", "robot", "night", "journey", "money")
+
+
+# =======================
+#   Variantes mesurées
+# =======================
+def consume(movies):
+    """Parcourt complètement un itérable (liste ou générateur) et renvoie le nombre d'éléments."""
+    return sum(1 for _ in movies)
+
+
+def _cache_classify(m):
+    import movie_cache
+    with movie_cache.MovieCache() as cache:
+        return consume(cache.classify(ORIGIN))
+
+
+def _query_select(m):
+    import movie_cache
+    import movie_query
+    with movie_cache.MovieCache() as cache:
+        return consume(movie_query.select(["origin", "eq", ORIGIN], cache))
+
+
+# nom -> (dossier de l'implémentation, {étape: fonction(module) -> nombre de films})
+VARIANTS = {
+    "mariam": ("Mariam", {
+        "main": lambda m: m.main(),
+    }),
+    "andrea": ("Andrea orlane", {
+        "load": lambda m: consume(m.load_movie_list()),
+        "classify": lambda m: consume(m.classify(m.load_movie_list(), ORIGIN)),
+        "save": lambda m: m.save_movie_list(m.classify(m.load_movie_list(), ORIGIN)),
+    }),
+    "hela": ("Hela", {
+        "load": lambda m: consume(m.load()),
+        "classify": lambda m: consume(m.classify(m.load(), ORIGIN)),
+        "save": lambda m: m.save(m.classify(m.load(), ORIGIN)),
+    }),
+    "hela-indexed": ("Hela", {
+        "classify": lambda m: consume(m.classify_indexed(ORIGIN)),
+        "save": lambda m: m.save(m.classify_indexed(ORIGIN)),
+    }),
+    "hela-parallel": ("Hela", {
+        "classify": lambda m: consume(m.classify_parallel(ORIGIN)),
+        "save": lambda m: m.save(m.classify_parallel(ORIGIN)),
+    }),
+    "hela-cache": ("Hela", {
+        "classify": _cache_classify,
+    }),
+    "hela-query": ("Hela", {
+        "classify": _query_select,
+    }),
+    "hela-jsonl-gzip": ("Hela", {
+        "save": lambda m: m.save(m.classify(m.load(), ORIGIN), m.output_path("jsonl", "gzip"), "jsonl", "gzip"),
+    }),
+    "hela-partition": ("Hela", {
+        "save": lambda m: sum(m.partition(m.load()).values()),
+    }),
+}
+
+
+# =======================
+#   Données synthétiques
+# =======================
+def parse_origins(text):
+    """'British:0.2,American:0.8' -> (['British', 'American'], [0.2, 0.8])."""
+    pairs = [item.split(":") for item in text.split(",") if item]
+    return [name for name, _ in pairs], [float(weight) for _, weight in pairs]
+
+
+def generate(path, count, origins, weights, plot_words, seed=0):
+    """Écrit un wiki_movie_plots.json de `count` films au fil de l'eau (mémoire constante)."""
+    rng = random.Random(seed)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(count):
+            movie = {
+                "Release Year": rng.randint(1900, 2020),
+                "Title": f"Film {i}",
+                "Origin": {"Ethnicity": rng.choices(origins, weights)[0]},
+                "Director": f"Director {rng.randint(1, 5000)}",
+                "Cast": ", ".join(f"Actor {rng.randint(1, 20000)}" for _ in range(3)),
+                "Genre": rng.choice(("drama", "comedy", "action", "thriller", "romance", "unknown")),
+                "Wiki Page": f"https://en.wikipedia.org/wiki/Film_{i}",
+                "Plot": " ".join(rng.choices(WORDS, k=plot_words)),
+            }
+            if i:
+                f.write(", ")
+            json.dump(movie, f)
+        f.write("]")
+    os.replace(tmp_path, path)
+
+
+def dataset_dir(count, origins_spec, plot_words, seed):
+    """Dossier de travail d'un jeu de données : réutilisé tant que les paramètres sont identiques."""
+    key = hashlib.sha1(f"{count}|{origins_spec}|{plot_words}|{seed}".encode()).hexdigest()[:10]
+    directory = os.path.join(WORK_DIR, f"{count}-{key}")
+    source = os.path.join(directory, "input", "wiki_movie_plots.json")
+    if not os.path.exists(source):
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+        print(f"génération de {count} films dans {source}...", file=sys.stderr)
+        origins, weights = parse_origins(origins_spec)
+        generate(source, count, origins, weights, plot_words, seed)
+    return directory
+
+
+# =======================
+#   Mesures
+# =======================
+def run_child(variant, stage, directory):
+    """Exécuté dans le processus fils : lance une étape depuis <directory>/run (chemins ../input, ../output)."""
+    folder, stages = VARIANTS[variant]
+    run_dir = os.path.join(directory, "run")
+    os.makedirs(run_dir, exist_ok=True)
+    os.chdir(run_dir)
+    sys.path.insert(0, os.path.join(ROOT, folder))
+    sys.argv = ["movie_wiki.py"]
+    import movie_wiki
+    stdout = sys.stdout
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull                      # Mariam affiche chaque titre
+        try:
+            count = stages[stage](movie_wiki)
+        finally:
+            sys.stdout = stdout
+    wall = time.perf_counter() - start
+    print(json.dumps({"wall_s": wall, "count": count}))
+
+
+def output_bytes(directory):
+    total = 0
+    for name in os.listdir(directory):
+        total += os.path.getsize(os.path.join(directory, name))
+    return total
+
+
+def measure(variant, stage, directory):
+    """Lance l'étape dans un processus neuf ; renvoie temps, pic RSS (Ko) et octets écrits."""
+    output_dir = os.path.join(directory, "output")
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", variant, stage, directory],
+        stdout=subprocess.PIPE, text=True,
+    )
+    out = proc.stdout.read()
+    proc.stdout.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"{variant}/{stage} a échoué (code {proc.returncode})")
+    result = json.loads(out.strip().splitlines()[-1])
+    result["peak_rss_kb"] = peak_rss_kb(usage)
+    result["output_bytes"] = output_bytes(output_dir)
+    return result
+
+
+def peak_rss_kb(usage):
+    """ru_maxrss en Kio : le noyau le donne en Kio sous Linux, mais en octets sous macOS."""
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai des implémentations de movie_wiki.py.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"nombres de films (défaut : {DEFAULT_SIZES})")
+    parser.add_argument("--origins", default=DEFAULT_ORIGINS, help="répartition des origines, nom:poids,...")
+    parser.add_argument("--plot-words", type=int, default=60, help="mots par résumé (défaut : 60)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="variantes à mesurer (séparées par des virgules)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="exécutions par étape (la première est « à froid » pour les index et caches)")
+    parser.add_argument("--out", default=RESULTS_PATH, help="fichier JSON Lines où ajouter les résultats")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+
+    variants = [v for v in args.variants.split(",") if v]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"variantes inconnues : {', '.join(unknown)} (choix : {', '.join(VARIANTS)})")
+    commit = git_commit()
+    print(f"{'films':>10} {'variante':<16} {'étape':<9} {'run':>3} {'temps (s)':>10} {'pic RSS (Mo)':>13} {'sortie (Mo)':>12}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "a", encoding="utf-8") as results:
+        for size in args.sizes.split(","):
+            count = parse_size(size)
+            directory = dataset_dir(count, args.origins, args.plot_words, args.seed)
+            for variant in variants:
+                for stage in VARIANTS[variant][1]:
+                    for run in range(args.repeat):
+                        result = measure(variant, stage, directory)
+                        row = {
+                            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                            "commit": commit, "python": sys.version.split()[0],
+                            "records": count, "origins": args.origins, "plot_words": args.plot_words,
+                            "variant": variant, "stage": stage, "run": run, **result,
+                        }
+                        results.write(json.dumps(row) + "\n")
+                        results.flush()
+                        print(f"{count:>10} {variant:<16} {stage:<9} {run:>3} {result['wall_s']:>10.3f} "
+                              f"{result['peak_rss_kb'] / 1024:>13.1f} {result['output_bytes'] / 1e6:>12.2f}")
+
+
+# =======================
+#   Point d'entrée
+# =======================
+if __name__ == "__main__":
+    main()
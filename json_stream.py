@@ -0,0 +1,137 @@
+"""
+Lecture en flux d'un tableau JSON (wiki_movie_plots.json), commune aux trois movie_wiki.py
+---------------------------------------------------------
+- scan() produit les éléments du tableau un par un : le fichier n'est jamais chargé en entier
+- Position et taille en octets de chaque élément sur demande (with_offsets=True), et reprise
+  juste après un élément déjà lu (start) : utilisées par les index et le cache de Hela/
+- write() écrit les éléments au fil de l'eau (tableau JSON ou JSON Lines, compression
+  facultative) dans un fichier .part renommé à la fin : la sortie n'est jamais incomplète
+
+"""
+
+# --- Imports ---
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+
+# --- Constantes par défaut ---
+CHUNK_SIZE = 1 << 16
+JSON_WS = " \t\r\n"
+OPENERS = {None: open, "gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+EXTENSIONS = {None: "", "gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+
+def scan(path, chunk_size=CHUNK_SIZE, with_offsets=False, start=0):
+    """Parcourt le tableau JSON film par film et produit (offset, taille, film).
+
+    Avec with_offsets=True, offset et taille sont la position et la longueur en octets
+    du film dans le fichier (sinon None) : de quoi le relire plus tard avec un seek.
+    start permet de reprendre juste après un film déjà lu (octet de fin de ce film).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "rb") as raw:
+        raw.seek(start)
+        f = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        buf, pos = "", 0
+        offset = start
+        state = "sep" if start else "start"
+        while True:
+            skipped = pos
+            while pos < len(buf) and buf[pos] in JSON_WS:
+                pos += 1
+            offset += pos - skipped
+            if pos == len(buf):
+                buf, pos = f.read(chunk_size), 0
+                if not buf:
+                    raise ValueError(f"{path} : fin de fichier avant le ']' final")
+                continue
+            c = buf[pos]
+            if state == "start":
+                if c != "[":
+                    raise ValueError(f"{path} : un tableau JSON est attendu")
+                pos += 1
+                offset += 1
+                state = "first"
+            elif c == "]" and state in ("first", "sep"):
+                return
+            elif state == "sep":
+                if c != ",":
+                    raise ValueError(f"{path} : ',' attendu à l'octet {offset}")
+                pos += 1
+                offset += 1
+                state = "value"
+            else:
+                try:
+                    movie, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    end = None
+                if end is None or end == len(buf):
+                    # objet coupé par la fin du tampon : on relit un bloc au moins
+                    # aussi grand que ce qui reste pour ne pas décoder en boucle
+                    more = f.read(max(chunk_size, len(buf) - pos))
+                    if more:
+                        buf, pos = buf[pos:] + more, 0
+                        continue
+                    if end is None:
+                        raise ValueError(f"{path} : JSON invalide à l'octet {offset}")
+                if with_offsets:
+                    size = len(buf[pos:end].encode("utf-8"))
+                    yield offset, size, movie
+                    offset += size
+                else:
+                    yield None, None, movie
+                pos = end
+                state = "sep"
+
+
+def array_start(f, chunk_size=CHUNK_SIZE):
+    """Octet qui suit le '[' ouvrant du tableau dans le fichier binaire f, None si le premier
+    caractère après les blancs (en nombre quelconque) n'est pas '[' : même règle que scan()."""
+    f.seek(0)
+    offset, ws = 0, JSON_WS.encode("ascii")
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            return None
+        rest = block.lstrip(ws)
+        offset += len(block) - len(rest)
+        if rest:
+            return offset + 1 if rest.startswith(b"[") else None
+
+
+def write(items, path, fmt="json", compression=None):
+    """Écrit les éléments au fil de l'eau et renvoie leur nombre.
+
+    fmt="json" produit la même sortie que json.dump d'une liste, fmt="jsonl" un élément par ligne.
+    compression vaut None, "gzip", "bz2" ou "xz". L'écriture se fait dans <path>.part, renommé
+    en <path> une fois terminé : le fichier final n'est jamais incomplet, et un lecteur JSON Lines
+    peut déjà suivre le .part pendant l'écriture.
+    """
+    count = 0
+    tmp_path = path + ".part"
+    try:
+        with OPENERS[compression](tmp_path, "wt", encoding="utf-8") as f:
+            if fmt == "jsonl":
+                for item in items:
+                    f.write(json.dumps(item))
+                    f.write("\n")
+                    count += 1
+            elif fmt == "json":
+                f.write("[")
+                for item in items:
+                    if count:
+                        f.write(", ")
+                    json.dump(item, f)
+                    count += 1
+                f.write("]")
+            else:
+                raise ValueError(f"format de sortie inconnu : {fmt}")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
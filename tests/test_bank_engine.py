@@ -0,0 +1,68 @@
+"""
+Tests du moteur de comptes (bank_engine) et de sa persistance (bank_storage)
+"""
+
+# --- Imports ---
+import math
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank_engine import Account                      # noqa: E402
+from bank_storage import BankStore                   # noqa: E402
+
+
+# ===========================
+# Soldes et plafonds non finis
+# ===========================
+@pytest.mark.parametrize("balance, limit", [(math.nan, 1000.0), (math.inf, 1000.0), (100.0, -math.inf)])
+def test_account_rejects_non_finite(balance, limit):
+    with pytest.raises(ValueError):
+        Account("X", balance, limit)
+
+
+def test_store_rejects_non_finite_account_then_operates(tmp_path):
+    store = BankStore(str(tmp_path))
+    other = store.create_account("Y", 100.0)
+    with pytest.raises(ValueError):
+        store.create_account("X", math.nan)
+    with pytest.raises(ValueError):
+        store.create_account("X", 100.0, math.inf)
+
+    # Le registre n'a pas été touché : l'index des soldes reste cohérent et le dépôt est journalisé
+    assert len(store.accounts) == 1
+    assert other.deposit(50.0)
+    assert [acc.account_number for acc in store.accounts.by_balance(minimum=150.0)] == [other.account_number]
+    store.close()
+
+    reopened = BankStore(str(tmp_path))
+    assert len(reopened.accounts) == 1
+    assert reopened.accounts.get(other.account_number).balance == 150.0
+    reopened.close()
+
+
+# ===========================
+# Transferts croisés
+# ===========================
+def test_crossed_transfers_same_number_do_not_deadlock():
+    a, b = Account("A", 10_000.0, 10_000.0, account_number=42), Account("B", 10_000.0, 10_000.0, account_number=42)
+
+    failures = []
+
+    def run(source, target):
+        for _ in range(2000):
+            if not source.transfer(1.0, target):
+                failures.append(source.holder_name)
+
+    threads = [threading.Thread(target=run, args=pair, daemon=True) for pair in ((a, b), (b, a))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    assert not any(t.is_alive() for t in threads)
+    assert not failures
+    assert a.balance + b.balance == 20_000.0
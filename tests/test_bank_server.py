@@ -0,0 +1,64 @@
+"""
+Tests du serveur de transactions (bank_server)
+"""
+
+# --- Imports ---
+import asyncio
+import contextlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank_server import BankServer, JOURNAL_ERROR       # noqa: E402
+from bank_storage import BankStore                      # noqa: E402
+
+
+# ===========================
+# Échec du fsync d'un paquet
+# ===========================
+def test_failed_commit_replies_with_errors_and_keeps_serving(tmp_path):
+    store = BankStore(str(tmp_path / "data"))
+    store.create_account("Ross", 100.0)
+    commit = store.commit
+    failures = [OSError("disque plein")]
+
+    def failing_commit():
+        if failures:
+            raise failures.pop()
+        commit()
+
+    store.commit = failing_commit
+    socket_path = str(tmp_path / "bank.sock")
+
+    async def scenario():
+        server = BankServer(store)
+        task = asyncio.create_task(server.serve(unix_path=socket_path))
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+
+        async def request(payload):
+            writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+            return json.loads(await asyncio.wait_for(reader.readline(), timeout=5))
+
+        try:
+            return (await request({"id": 1, "op": "deposit", "account": "Ross", "amount": 10}),
+                    await request({"id": 2, "op": "balance", "account": "Ross"}))
+        finally:
+            writer.close()
+            await writer.wait_closed()
+            for _ in range(500):                 # 2 requêtes + la fermeture côté serveur
+                if server.applied >= 3 or task.done():
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    failed, after = asyncio.run(scenario())
+    assert failed["id"] == 1 and not failed["ok"] and failed["code"] == JOURNAL_ERROR
+    # Le paquet suivant est servi normalement : la boucle d'application n'est pas morte
+    assert after["id"] == 2 and after["ok"] and after["balance"] == 110.0
+    store.close()
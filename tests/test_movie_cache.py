@@ -0,0 +1,40 @@
+"""
+Tests du cache colonnaire de Hela/ (movie_cache)
+"""
+
+# --- Imports ---
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Hela"))
+
+import movie_cache                                       # noqa: E402
+
+
+def movie(title, year, origin="British"):
+    return {"Release Year": year, "Title": title, "Origin": {"Ethnicity": origin}, "Director": "", "Cast": "",
+            "Genre": "", "Plot": ""}
+
+
+# ===========================
+# Années hors de la colonne "i"
+# ===========================
+def test_out_of_range_year_is_stored_as_no_year(tmp_path):
+    path = str(tmp_path / "movies.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([movie("A", 1999), movie("B", 10 ** 12), movie("C", -10 ** 12)], f)
+    with movie_cache.MovieCache(path) as cache:
+        assert list(cache.year) == [1999, movie_cache.NO_YEAR, movie_cache.NO_YEAR]
+        assert len(list(cache.classify("British"))) == 3
+
+
+# ===========================
+# Source vide
+# ===========================
+def test_empty_source_gives_empty_cache(tmp_path):
+    path = str(tmp_path / "movies.json")
+    open(path, "wb").close()
+    with movie_cache.MovieCache(path) as cache:
+        assert len(cache) == 0
+        assert list(cache.classify("British")) == []
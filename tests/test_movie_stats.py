@@ -0,0 +1,36 @@
+"""
+Tests des statistiques de Hela/ (movie_stats)
+"""
+
+# --- Imports ---
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Hela"))
+
+import movie_stats                                       # noqa: E402
+
+
+def write_movies(path, origins):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"Title": str(i), "Release Year": 1990 + i, "Origin": {"Ethnicity": origin}}
+                   for i, origin in enumerate(origins)], f)
+
+
+# ===========================
+# Reprise après un ajout
+# ===========================
+def test_resume_keeps_unrequested_cached_states(tmp_path):
+    path = str(tmp_path / "movies.json")
+    write_movies(path, ["British", "American"])
+    movie_stats.aggregate(["count:origin", "count:decade"], path)
+
+    # Ajout en fin de tableau, puis une seule des deux statistiques demandée
+    write_movies(path, ["British", "American", "British"])
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert movie_stats.aggregate(["count:origin"], path) == {"count:origin": {"British": 2, "American": 1}}
+
+    # L'autre est toujours en cache, et à jour avec le film ajouté
+    assert "count:decade" in movie_stats.read_cache(path)["states"]
+    assert movie_stats.aggregate(["count:decade"], path) == {"count:decade": {"1990s": 3}}
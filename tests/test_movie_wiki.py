@@ -0,0 +1,54 @@
+"""
+Tests de la sélection de films de Hela/ (movie_wiki)
+"""
+
+# --- Imports ---
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Hela"))
+
+import movie_wiki                                        # noqa: E402
+
+
+def movie(title, origin):
+    return {"Title": title, "Origin": {"Ethnicity": origin}}
+
+
+# ===========================
+# Répartition par origine
+# ===========================
+def test_partition_accepts_non_string_origins(tmp_path):
+    movies = [movie("A", "British"), movie("B", 1999), movie("C", ["x"]), movie("D", None), movie("E", "British")]
+    counts = movie_wiki.partition(movies, str(tmp_path))
+    assert counts == {"British": 2, "1999": 1, "['x']": 1}
+    with open(tmp_path / "1999_movies.json", encoding="utf-8") as f:
+        assert [m["Title"] for m in json.load(f)] == ["B"]
+
+
+# ===========================
+# Découpage pour le filtrage parallèle
+# ===========================
+def test_parallel_classify_with_long_leading_whitespace(tmp_path, monkeypatch):
+    monkeypatch.setattr(movie_wiki, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(movie_wiki, "RANGE_MIN_BYTES", 64)
+    path = str(tmp_path / "movies.json")
+    movies = [movie(str(i), ("British", "American")[i % 2]) for i in range(50)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(" " * (movie_wiki.CHUNK_SIZE + 10) + json.dumps(movies))
+    expected = [m for m in movies if m["Origin"]["Ethnicity"] == "British"]
+    assert len(movie_wiki.record_ranges(path, 8)) > 1
+    assert list(movie_wiki.classify_parallel("British", path, workers=2)) == expected
+
+
+def test_record_ranges_without_array_falls_back_to_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(movie_wiki, "PARALLEL_MIN_BYTES", 0)
+    path = str(tmp_path / "movies.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"Title": "[pas un tableau]"}')
+    assert movie_wiki.record_ranges(path, 4) is None
+    with pytest.raises(ValueError, match="tableau JSON"):
+        list(movie_wiki.classify_parallel("British", path, workers=2))